@@ -1,6 +1,19 @@
+from pathlib import Path
+
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Every marker write validates against the boundary, so fail at startup rather than per request
+        if not Path(settings.CITY_BOUNDARY_FILE).is_file():
+            raise ImproperlyConfigured(
+                f'CITY_BOUNDARY_FILE {settings.CITY_BOUNDARY_FILE} does not exist; '
+                'set $CITY_BOUNDARY_FILE to the city boundary GeoJSON.'
+            )
+        from . import signals  # noqa: F401
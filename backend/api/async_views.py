@@ -0,0 +1,93 @@
+# Native async read paths for the hot public endpoints. Under the ASGI app
+# (backend/asgi.py) these run on the event loop and await the database through
+# Django's async ORM, so one worker can hold many slow map clients at once.
+# DRF views are synchronous, so these are plain Django views returning JSON
+# from the same serializers; the querysets are fully joined so serializing
+# never touches the database from async code.
+
+import json
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+
+from .events import get_broker
+from .models import Business, Investible
+from .serializers import BusinessSerializer, InvestibleSerializer, MarkerSerializer
+from .views import MarkerViewSet, parse_positive_int
+
+ASYNC_CHUNK_SIZE = 2000
+
+# Idle seconds between SSE keep-alive comments, so proxies keep the stream open
+EVENT_HEARTBEAT = 15
+
+
+def _error(detail, status):
+    return JsonResponse(detail, status=status, safe=False)
+
+
+@require_GET
+async def async_marker_list(request):
+    # Same bbox, zone, ?status=-style filters and ?ordering= as MarkerViewSet.list;
+    # building the queryset is lazy, so it is safe to do from async code
+    view = MarkerViewSet(request=Request(request), action='list', format_kwarg=None)
+    try:
+        queryset = view.filter_queryset(view.get_queryset())
+        limit = parse_positive_int(request.GET, 'limit', maximum=MarkerViewSet.max_limit)
+    except ValidationError as exc:
+        return _error(exc.detail, 400)
+    if limit is not None:
+        queryset = (queryset if queryset.ordered else queryset.order_by('marker_id'))[:limit]
+    markers = [marker async for marker in queryset.aiterator(chunk_size=ASYNC_CHUNK_SIZE)]
+    return JsonResponse(MarkerSerializer(markers, many=True).data, safe=False)
+
+
+@require_GET
+async def async_business_list(request):
+    businesses = [business async for business in Business.objects.aiterator(chunk_size=ASYNC_CHUNK_SIZE)]
+    return JsonResponse(BusinessSerializer(businesses, many=True).data, safe=False)
+
+
+@require_GET
+async def async_business_detail(request, pk):
+    try:
+        business = await Business.objects.aget(business_id=pk)
+    except Business.DoesNotExist:
+        return _error({'error': 'Business not found'}, 404)
+    return JsonResponse(BusinessSerializer(business).data)
+
+
+@require_GET
+async def async_investible_list(request):
+    investibles = [investible async for investible in Investible.objects.aiterator(chunk_size=ASYNC_CHUNK_SIZE)]
+    return JsonResponse(InvestibleSerializer(investibles, many=True).data, safe=False)
+
+
+@require_GET
+async def async_investible_detail(request, pk):
+    try:
+        investible = await Investible.objects.aget(investible_id=pk)
+    except Investible.DoesNotExist:
+        return _error({'error': 'Investible not found'}, 404)
+    return JsonResponse(InvestibleSerializer(investible).data)
+
+
+@require_GET
+async def marker_events(request):
+    """
+    Server-Sent Events stream of marker upserts and deletes. Clients apply the
+    deltas to their marker list and refetch it on a ``resync`` event.
+    """
+    async def stream():
+        yield 'retry: 3000\n\n'
+        async for event in get_broker().listen(heartbeat=EVENT_HEARTBEAT):
+            if event is None:
+                yield ': keep-alive\n\n'
+            else:
+                yield f"id: {event['id']}\nevent: marker\ndata: {json.dumps(event)}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
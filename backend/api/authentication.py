@@ -1,8 +1,60 @@
 # MultipleFiles/authentication.py
+import copy
+import threading
+import time
+from collections import OrderedDict
+
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
 from django.conf import settings
 from rest_framework.exceptions import AuthenticationFailed
 
+
+class UserCache:
+    """
+    Bounded LRU cache of resolved users with a per-entry TTL, keyed by
+    ``(user_id, jti)``. The TTL bounds staleness for writes made in other
+    worker processes; local writes drop entries through ``invalidate_user``.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self._lock:
+            self._entries[key] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
 class CookieJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
         # Try to get the access token from the cookie
@@ -21,3 +73,12 @@ class CookieJWTAuthentication(JWTAuthentication):
             # The frontend (AuthContext) will then decide to call the refresh endpoint.
             raise AuthenticationFailed('Access token invalid or expired', code='token_not_valid')
 
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        key = (str(user_id), validated_token.get(api_settings.JTI_CLAIM))
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        # Hand each request its own instance so per-request changes never leak into the cache
+        return copy.copy(user)
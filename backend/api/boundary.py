@@ -0,0 +1,243 @@
+import json
+import math
+import threading
+from functools import lru_cache
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .conditional import bump_version
+from .exports import iter_keyset_batches
+from .models import Marker, Zone
+
+# Grid cell edge in degrees for the polygon bounding-box index (about 1.1 km)
+POLYGON_CELL_DEGREES = 0.01
+
+
+def polygon_parts(geometry):
+    """
+    Returns the polygons of a GeoJSON Polygon/MultiPolygon as lists of
+    ``(lon, lat)`` rings; other geometry types yield nothing.
+    """
+    geometry = geometry or {}
+    if geometry.get('type') == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry.get('type') == 'MultiPolygon':
+        return list(geometry['coordinates'])
+    return []
+
+
+def _ring_contains(ring, longitude, latitude):
+    # Ray casting towards +longitude; edges are half-open so shared vertices count once
+    inside = False
+    x2, y2 = ring[-1][0], ring[-1][1]
+    for point in ring:
+        x1, y1 = x2, y2
+        x2, y2 = point[0], point[1]
+        if (y1 > latitude) != (y2 > latitude):
+            if longitude < x1 + (latitude - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+    return inside
+
+
+def _ring_edges(ring):
+    """
+    Returns a ring's edges as ``(start, end)`` arrays of ``(lon, lat)`` rows, in
+    the order _ring_contains walks them.
+    """
+    points = np.array([point[:2] for point in ring], dtype=float)
+    return np.roll(points, 1, axis=0), points
+
+
+def _rings_contain(edges, longitudes, latitudes):
+    """
+    Vectorized even-odd _ring_contains over every ring of a polygon: one
+    points x edges crossing matrix per ring.
+    """
+    inside = np.zeros(len(longitudes), dtype=bool)
+    longitudes, latitudes = longitudes[:, None], latitudes[:, None]
+    for start, end in edges:
+        x1, y1, x2, y2 = start[:, 0], start[:, 1], end[:, 0], end[:, 1]
+        crosses = (y1 > latitudes) != (y2 > latitudes)
+        # Horizontal edges divide by zero, but never cross
+        with np.errstate(divide='ignore', invalid='ignore'):
+            hits = crosses & (longitudes < x1 + (latitudes - y1) * (x2 - x1) / (y2 - y1))
+        inside ^= hits.sum(axis=1) % 2 == 1
+    return inside
+
+
+def _bbox(rings):
+    lons = [point[0] for ring in rings for point in ring]
+    lats = [point[1] for ring in rings for point in ring]
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+class PolygonIndex:
+    """
+    Point-in-polygon lookups over keyed polygons. Each polygon part's bounding
+    box is prepared once and registered in the grid cells it overlaps, so a
+    lookup only ray-casts the few parts whose box contains the point;
+    ``locate_many`` tests a whole batch of points against each part at once.
+    """
+
+    def __init__(self, polygons, cell_degrees=POLYGON_CELL_DEGREES):
+        self._cell_degrees = cell_degrees
+        self._parts = []
+        self._edges = []
+        self._cells = {}
+        for key, geometry in polygons:
+            for rings in polygon_parts(geometry):
+                bbox = _bbox(rings)
+                part = len(self._parts)
+                self._parts.append((key, bbox, rings))
+                self._edges.append([_ring_edges(ring) for ring in rings])
+                min_row, min_col = self._cell(bbox[1], bbox[0])
+                max_row, max_col = self._cell(bbox[3], bbox[2])
+                for row in range(min_row, max_row + 1):
+                    for col in range(min_col, max_col + 1):
+                        self._cells.setdefault((row, col), []).append(part)
+
+    def _cell(self, latitude, longitude):
+        return math.floor(latitude / self._cell_degrees), math.floor(longitude / self._cell_degrees)
+
+    def __bool__(self):
+        return bool(self._parts)
+
+    @property
+    def bbox(self):
+        """
+        ``(min_lon, min_lat, max_lon, max_lat)`` over every polygon.
+        """
+        boxes = [bbox for _, bbox, _ in self._parts]
+        return (
+            min(box[0] for box in boxes), min(box[1] for box in boxes),
+            max(box[2] for box in boxes), max(box[3] for box in boxes),
+        )
+
+    def locate(self, latitude, longitude):
+        """
+        Returns the key of the first polygon containing the point, or ``None``.
+        """
+        for part in self._cells.get(self._cell(latitude, longitude), ()):
+            key, (min_lon, min_lat, max_lon, max_lat), rings = self._parts[part]
+            if not (min_lon <= longitude <= max_lon and min_lat <= latitude <= max_lat):
+                continue
+            # Even-odd over every ring, so holes are excluded
+            inside = False
+            for ring in rings:
+                if _ring_contains(ring, longitude, latitude):
+                    inside = not inside
+            if inside:
+                return key
+        return None
+
+    def locate_many(self, latitudes, longitudes):
+        """
+        Returns ``locate`` for each point of a batch, as a list.
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        keys = [None] * len(latitudes)
+        pending = np.ones(len(latitudes), dtype=bool)
+        for (key, (min_lon, min_lat, max_lon, max_lat), _), edges in zip(self._parts, self._edges):
+            candidates = np.flatnonzero(
+                pending
+                & (longitudes >= min_lon) & (longitudes <= max_lon)
+                & (latitudes >= min_lat) & (latitudes <= max_lat)
+            )
+            if not len(candidates):
+                continue
+            found = candidates[_rings_contain(edges, longitudes[candidates], latitudes[candidates])]
+            pending[found] = False
+            for position in found.tolist():
+                keys[position] = key
+        return keys
+
+    def contains(self, latitude, longitude):
+        return self.locate(latitude, longitude) is not None
+
+
+@lru_cache(maxsize=1)
+def get_city_index():
+    """
+    Returns a PolygonIndex over the polygons in ``settings.CITY_BOUNDARY_FILE``;
+    label points and other features are ignored.
+    """
+    with open(settings.CITY_BOUNDARY_FILE, encoding='utf-8') as handle:
+        features = json.load(handle).get('features', [])
+    return PolygonIndex((index, feature.get('geometry')) for index, feature in enumerate(features))
+
+
+def get_boundary_bbox():
+    """
+    Returns the ``(min_lon, min_lat, max_lon, max_lat)`` of the city boundary.
+    """
+    return get_city_index().bbox
+
+
+def in_city(latitude, longitude):
+    return get_city_index().contains(latitude, longitude)
+
+
+_zone_index = None
+_zone_index_lock = threading.Lock()
+
+
+def get_zone_index():
+    """
+    Returns the process-wide PolygonIndex over Zone rows, keyed by zone_id.
+    Zones are only written by `manage.py load_zones`, so other worker
+    processes pick up new zones when they restart.
+    """
+    global _zone_index
+    if _zone_index is None:
+        with _zone_index_lock:
+            if _zone_index is None:
+                _zone_index = PolygonIndex(Zone.objects.values_list('zone_id', 'geometry'))
+    return _zone_index
+
+
+def reset_zone_index():
+    global _zone_index
+    _zone_index = None
+
+
+def zone_for(latitude, longitude):
+    return get_zone_index().locate(latitude, longitude)
+
+
+def _reclassify_batch(index, rows, now):
+    zones = index.locate_many([row[1] for row in rows], [row[2] for row in rows])
+    # bulk_update skips auto_now, so stamp updated_at for /api/sync/ by hand
+    changed = [
+        Marker(marker_id=marker_id, zone_id=zone, updated_at=now)
+        for (marker_id, _, _, zone_id), zone in zip(rows, zones)
+        if zone != zone_id
+    ]
+    Marker.objects.bulk_update(changed, ['zone', 'updated_at'])
+    return len(changed)
+
+
+def reclassify_markers(batch_size=2000):
+    """
+    Reassigns every marker to the zone containing it, reading markers in
+    keyset batches, locating each batch at once and writing only changed rows
+    with one bulk_update per batch; returns the number of markers whose zone
+    changed.
+    """
+    index = get_zone_index()
+    updated = 0
+    now = timezone.now()
+    fields = ['marker_id', 'latitude', 'longitude', 'zone_id']
+    batch = []
+    for row in iter_keyset_batches(Marker.objects.all(), 'marker_id', fields, batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            updated += _reclassify_batch(index, batch, now)
+            batch = []
+    if batch:
+        updated += _reclassify_batch(index, batch, now)
+    if updated:
+        bump_version(Marker)
+    return updated
@@ -0,0 +1,218 @@
+import math
+
+import numpy as np
+from django.db import transaction
+
+from .geohash import bbox_q
+from .models import Business, InvestibleCatchment, Marker
+from .spatial import EARTH_RADIUS_M, MarkerGridIndex, haversine_many
+
+# Radii (meters) business counts are kept for
+CATCHMENT_RADII = (250, 500, 1000)
+
+# Same-industry businesses inside this radius count as direct competition
+COMPETITION_RADIUS = 500
+
+# Investibles computed per batch; each batch loads only the businesses around it
+CATCHMENT_CHUNK_SIZE = 500
+
+# Upper bound on origin x business distance matrix entries computed at once
+CATCHMENT_MATRIX_SIZE = 2_000_000
+
+
+def _span(latitude, radius_m):
+    """
+    Returns the ``(lat_span, lon_span)`` in degrees covering ``radius_m`` around a latitude.
+    """
+    angular = radius_m / EARTH_RADIUS_M
+    cos_lat = math.cos(math.radians(latitude))
+    ratio = math.sin(angular) / cos_lat if cos_lat > 1e-12 else 2.0
+    return math.degrees(angular), math.degrees(math.asin(ratio)) if ratio < 1 else 180.0
+
+
+def _bbox_around(points, radius_m):
+    lats = [lat for lat, _ in points]
+    lons = [lon for _, lon in points]
+    widest = max(lats, key=abs)
+    lat_span, lon_span = _span(widest, radius_m)
+    return min(lats) - lat_span, min(lons) - lon_span, max(lats) + lat_span, max(lons) + lon_span
+
+
+def match_industry(preferred_business):
+    """
+    Maps an investible's free-text ``preferred_business`` onto a Business industry.
+    """
+    text = (preferred_business or '').lower()
+    for value, _ in Business.INDUSTRY_CHOICES:
+        if value != 'other' and value in text:
+            return value
+    return None
+
+
+def _empty_counts():
+    return {str(radius): {'total': 0, 'industry': {}, 'status': {}} for radius in CATCHMENT_RADII}
+
+
+def _score(counts, active, industry):
+    """
+    Nearby active businesses of other industries (demand) per active
+    same-industry business within COMPETITION_RADIUS (competition).
+    """
+    if industry is None:
+        return None
+    outer = str(max(CATCHMENT_RADII))
+    demand = active[outer] - active.get(f'{outer}:{industry}', 0)
+    competition = active.get(f'{COMPETITION_RADIUS}:{industry}', 0)
+    return round(demand / (1 + competition), 3)
+
+
+def _counts_row(industries, statuses, by_industry, by_status, active_by_industry):
+    """
+    Returns one origin's ``(counts, active)`` from its per-radius count arrays.
+    """
+    counts = _empty_counts()
+    active = {str(radius): 0 for radius in CATCHMENT_RADII}
+    for radius in CATCHMENT_RADII:
+        bucket = counts[str(radius)]
+        bucket['total'] = int(by_status[radius].sum())
+        bucket['industry'] = {
+            industry: int(count) for industry, count in zip(industries, by_industry[radius]) if count
+        }
+        bucket['status'] = {status: int(count) for status, count in zip(statuses, by_status[radius]) if count}
+        active[str(radius)] = int(active_by_industry[radius].sum())
+        for industry, count in zip(industries, active_by_industry[radius]):
+            if count:
+                active[f'{radius}:{industry}'] = int(count)
+    return counts, active
+
+
+def _compute_chunk(origins):
+    """
+    Returns catchment rows for ``(investible_id, latitude, longitude, preferred_business)`` origins.
+
+    Distances come from one haversine matrix per block of origins against every
+    candidate business marker, reduced to each business's closest marker (a
+    business with several markers counts once) and thresholded per radius.
+    """
+    outer = max(CATCHMENT_RADII)
+    min_lat, min_lon, max_lat, max_lon = _bbox_around([(lat, lon) for _, lat, lon, _ in origins], outer)
+    rows = sorted(Marker.objects.filter(
+        bbox_q(min_lon, min_lat, max_lon, max_lat),
+        business__isnull=False,
+    ).values_list('business_id', 'latitude', 'longitude', 'business__industry', 'business__status').iterator())
+
+    if rows:
+        business_ids = np.array([row[0] for row in rows])
+        latitudes = np.array([row[1] for row in rows], dtype=float)
+        longitudes = np.array([row[2] for row in rows], dtype=float)
+        # Rows are sorted by business, so each business is a run of matrix columns
+        starts = np.flatnonzero(np.r_[True, business_ids[1:] != business_ids[:-1]])
+        industries, industry_index = np.unique([rows[start][3] for start in starts], return_inverse=True)
+        statuses, status_index = np.unique([rows[start][4] for start in starts], return_inverse=True)
+        industry_matrix = np.eye(len(industries), dtype=np.int64)[industry_index]
+        status_matrix = np.eye(len(statuses), dtype=np.int64)[status_index]
+        active_matrix = industry_matrix * (statuses[status_index] == 'active')[:, None]
+        industries, statuses = industries.tolist(), statuses.tolist()
+    block = max(1, CATCHMENT_MATRIX_SIZE // max(1, len(rows)))
+
+    catchments = []
+    for start in range(0, len(origins), block):
+        part = origins[start:start + block]
+        if rows:
+            origin_lats = np.array([origin[1] for origin in part], dtype=float)[:, None]
+            origin_lons = np.array([origin[2] for origin in part], dtype=float)[:, None]
+            distances = np.minimum.reduceat(
+                haversine_many(origin_lats, origin_lons, latitudes, longitudes), starts, axis=1,
+            )
+            by_industry, by_status, active_by_industry = {}, {}, {}
+            for radius in CATCHMENT_RADII:
+                inside = (distances <= radius).astype(np.int64)
+                by_industry[radius] = inside @ industry_matrix
+                by_status[radius] = inside @ status_matrix
+                active_by_industry[radius] = inside @ active_matrix
+        for offset, (investible_id, _, _, preferred_business) in enumerate(part):
+            if rows:
+                counts, active = _counts_row(
+                    industries, statuses,
+                    {radius: by_industry[radius][offset] for radius in CATCHMENT_RADII},
+                    {radius: by_status[radius][offset] for radius in CATCHMENT_RADII},
+                    {radius: active_by_industry[radius][offset] for radius in CATCHMENT_RADII},
+                )
+            else:
+                counts, active = _empty_counts(), {str(radius): 0 for radius in CATCHMENT_RADII}
+            industry = match_industry(preferred_business)
+            catchments.append(InvestibleCatchment(
+                investible_id=investible_id,
+                counts=counts,
+                preferred_industry=industry,
+                score=_score(counts, active, industry),
+            ))
+    return catchments
+
+
+def compute_catchments(investible_ids=None, chunk_size=CATCHMENT_CHUNK_SIZE):
+    """
+    Recomputes the cached catchments of ``investible_ids`` (every investible
+    when ``None``); returns the number of catchments written.
+
+    An investible is measured from its first marker. Origins are processed in
+    spatially sorted chunks so each chunk only loads the businesses around it.
+    """
+    markers = Marker.objects.filter(invst__isnull=False)
+    if investible_ids is not None:
+        investible_ids = set(investible_ids)
+        if not investible_ids:
+            return 0
+        markers = markers.filter(invst_id__in=investible_ids)
+    origins = {}
+    rows = markers.order_by('marker_id').values_list('invst_id', 'latitude', 'longitude', 'invst__preferred_business')
+    for investible_id, latitude, longitude, preferred_business in rows.iterator():
+        origins.setdefault(investible_id, (investible_id, latitude, longitude, preferred_business))
+    ordered = sorted(origins.values(), key=lambda origin: (round(origin[1], 2), origin[2]))
+
+    written = 0
+    for start in range(0, len(ordered), chunk_size):
+        catchments = _compute_chunk(ordered[start:start + chunk_size])
+        with transaction.atomic():
+            InvestibleCatchment.objects.filter(pk__in=[c.investible_id for c in catchments]).delete()
+            InvestibleCatchment.objects.bulk_create(catchments)
+        written += len(catchments)
+
+    # Investibles that lost their last marker have no catchment
+    stale = InvestibleCatchment.objects.exclude(pk__in=origins)
+    if investible_ids is not None:
+        stale = stale.filter(pk__in=investible_ids)
+    stale.delete()
+    return written
+
+
+def investibles_near(points):
+    """
+    Returns the ids of investibles with a marker within the largest radius of
+    any point. One query reads the investible markers around all the points,
+    and a grid over the points settles the exact distances.
+    """
+    points = list(points)
+    if not points:
+        return set()
+    outer = max(CATCHMENT_RADII)
+    min_lat, min_lon, max_lat, max_lon = _bbox_around(points, outer)
+    rows = Marker.objects.filter(
+        bbox_q(min_lon, min_lat, max_lon, max_lat),
+        invst__isnull=False,
+    ).values_list('invst_id', 'latitude', 'longitude')
+    grid = MarkerGridIndex()
+    grid.load((index, latitude, longitude) for index, (latitude, longitude) in enumerate(points))
+    return {
+        investible_id for investible_id, latitude, longitude in rows.iterator()
+        if grid.within(latitude, longitude, outer)
+    }
+
+
+def refresh_catchments_near(points):
+    """
+    Recomputes the catchments a business marker change at any of ``points`` can affect.
+    """
+    points = list(points)
+    if points:
+        compute_catchments(investibles_near(points))
@@ -0,0 +1,212 @@
+import math
+import threading
+from collections import Counter
+
+from .conditional import current_versions
+from .models import Business, Marker
+
+# Leaflet zoom levels the index keeps aggregates for. Requests above this
+# zoom are answered from the deepest level.
+MAX_ZOOM = 16
+
+# Cluster radius in screen pixels; a 256px tile holds 256 / 64 = 4 cells per axis.
+CLUSTER_RADIUS_PX = 64
+CELLS_PER_TILE = 256 // CLUSTER_RADIUS_PX
+
+# Breakdown key used for markers that belong to an investible instead of a business
+INVESTIBLE_KEY = 'investible'
+
+MAX_MERCATOR_LAT = 85.05112878
+
+# Models whose writes change the index: marker positions and business industries
+INDEX_MODELS = (Marker, Business)
+
+
+def project(latitude, longitude):
+    """
+    Projects a WGS84 point to normalized Web Mercator coordinates in [0, 1].
+    """
+    lat = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, latitude))
+    x = (longitude + 180.0) / 360.0
+    sin_lat = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+
+def cell_for(x, y, zoom):
+    cells = CELLS_PER_TILE << zoom
+    return min(int(x * cells), cells - 1), min(int(y * cells), cells - 1)
+
+
+class _Cell:
+    __slots__ = ('count', 'sum_lat', 'sum_lon', 'industries')
+
+    def __init__(self):
+        self.count = 0
+        self.sum_lat = 0.0
+        self.sum_lon = 0.0
+        self.industries = Counter()
+
+
+class MarkerClusterIndex:
+    """
+    Grid-based hierarchical cluster index over every Marker.
+
+    Each zoom level keeps one aggregate (count, coordinate sums and industry
+    breakdown) per screen cell, so adding, moving or removing a marker only
+    touches one cell per level instead of rebuilding the hierarchy.
+    ``versions`` holds the INDEX_MODELS version stamps the contents reflect.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._levels = [dict() for _ in range(MAX_ZOOM + 1)]
+        self._points = {}
+        self.versions = None
+
+    @staticmethod
+    def _point_for(marker_id, latitude, longitude, industry):
+        x, y = project(latitude, longitude)
+        return marker_id, latitude, longitude, x, y, industry or INVESTIBLE_KEY
+
+    def _add(self, point):
+        marker_id, latitude, longitude, x, y, industry = point
+        for zoom, cells in enumerate(self._levels):
+            key = cell_for(x, y, zoom)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = _Cell()
+            cell.count += 1
+            cell.sum_lat += latitude
+            cell.sum_lon += longitude
+            cell.industries[industry] += 1
+        self._points[marker_id] = point
+
+    def _remove(self, marker_id):
+        point = self._points.pop(marker_id, None)
+        if point is None:
+            return
+        _, latitude, longitude, x, y, industry = point
+        for zoom, cells in enumerate(self._levels):
+            key = cell_for(x, y, zoom)
+            cell = cells[key]
+            cell.count -= 1
+            if cell.count == 0:
+                del cells[key]
+                continue
+            cell.sum_lat -= latitude
+            cell.sum_lon -= longitude
+            cell.industries[industry] -= 1
+            if not cell.industries[industry]:
+                del cell.industries[industry]
+
+    def load(self, rows, versions=None):
+        """
+        Replaces the index contents with ``(marker_id, latitude, longitude, industry)`` rows.
+        """
+        with self._lock:
+            self._levels = [dict() for _ in range(MAX_ZOOM + 1)]
+            self._points = {}
+            for row in rows:
+                self._add(self._point_for(*row))
+            self.versions = versions
+
+    def apply(self, model, version, upserts=(), removals=()):
+        """
+        Applies a committed write that moved ``model``'s version stamp to
+        ``version``. Writes that do not directly follow the reflected version
+        (another process wrote in between) are skipped, leaving the index behind
+        the stamps so the next get_cluster_index() rebuilds it.
+        """
+        position = INDEX_MODELS.index(model)
+        with self._lock:
+            if self.versions is None or self.versions[position] != version - 1:
+                return
+            for marker_id in removals:
+                self._remove(marker_id)
+            for row in upserts:
+                self._remove(row[0])
+                self._add(self._point_for(*row))
+            self.versions = self.versions[:position] + (version,) + self.versions[position + 1:]
+
+    def clusters(self, zoom, bbox=None):
+        """
+        Returns the clusters at ``zoom`` whose cells intersect ``bbox``
+        (``min_lon, min_lat, max_lon, max_lat``), or every cluster when no bbox is given.
+        """
+        zoom = max(0, min(zoom, MAX_ZOOM))
+        with self._lock:
+            cells = self._levels[zoom]
+            if bbox is None:
+                selected = list(cells.values())
+            else:
+                min_lon, min_lat, max_lon, max_lat = bbox
+                min_x, min_y = cell_for(*project(max_lat, min_lon), zoom)
+                max_x, max_y = cell_for(*project(min_lat, max_lon), zoom)
+                span = (max_x - min_x + 1) * (max_y - min_y + 1)
+                if span < len(cells):
+                    selected = [
+                        cells[(cx, cy)]
+                        for cx in range(min_x, max_x + 1)
+                        for cy in range(min_y, max_y + 1)
+                        if (cx, cy) in cells
+                    ]
+                else:
+                    selected = [
+                        cell for (cx, cy), cell in cells.items()
+                        if min_x <= cx <= max_x and min_y <= cy <= max_y
+                    ]
+            return [
+                {
+                    'latitude': cell.sum_lat / cell.count,
+                    'longitude': cell.sum_lon / cell.count,
+                    'count': cell.count,
+                    'industries': dict(cell.industries),
+                }
+                for cell in selected
+            ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_cluster_index():
+    """
+    Returns the process-wide cluster index, rebuilding it from the Marker table
+    on first use and whenever it is behind the version stamps, which is how
+    writes committed by other worker processes reach this one.
+    """
+    global _index
+    versions = current_versions(*INDEX_MODELS)
+    if _index is None or _index.versions != versions:
+        with _index_lock:
+            if _index is None or _index.versions != versions:
+                index = MarkerClusterIndex()
+                # Stamps are read before the rows, so a write landing in between
+                # only makes the next read rebuild again
+                index.load(
+                    Marker.objects.values_list('marker_id', 'latitude', 'longitude', 'business__industry').iterator(),
+                    versions,
+                )
+                _index = index
+    return _index
+
+
+def reset_cluster_index():
+    """
+    Drops the cached index so the next request rebuilds it from the database.
+    """
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def apply_cluster_write(model, version, upserts=(), removals=()):
+    """
+    Applies a committed write to the index if it has been built; ``upserts``
+    are ``(marker_id, latitude, longitude, industry)`` rows. Called from the
+    on_commit hooks in signals.py.
+    """
+    if _index is not None:
+        _index.apply(model, version, upserts, removals)
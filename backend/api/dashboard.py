@@ -0,0 +1,139 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import Business, DashboardSummary, Investible, Marker, Report, User
+from .stats import _grouped_counts
+
+SUMMARY_PK = 1
+
+
+def compute_summary():
+    """
+    Counts every dashboard total from the source tables.
+    """
+    businesses = _grouped_counts(Business, 'industry')
+    investibles = _grouped_counts(Investible, 'area')
+    return {
+        'businesses': {
+            'total': businesses['total'],
+            'by_status': businesses['by_status'],
+            'by_industry': dict.fromkeys([value for value, _ in Business.INDUSTRY_CHOICES], 0)
+            | businesses['by_industry'],
+        },
+        'investibles': {
+            'total': investibles['total'],
+            'by_status': investibles['by_status'],
+        },
+        'markers': {'total': Marker.objects.count()},
+        'reports': {'total': Report.objects.count()},
+        'users': {'total': User.objects.count()},
+    }
+
+
+def _apply(counts, changes):
+    for path, delta in changes.items():
+        *parents, leaf = path.split('.')
+        node = counts
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = node.get(leaf, 0) + delta
+
+
+def adjust_summary(changes):
+    """
+    Applies ``changes`` (``{'businesses.by_status.active': 1, ...}``) to the
+    summary row under a row lock. A missing row is created from a full count,
+    which already includes the write being reported.
+    """
+    changes = {path: delta for path, delta in changes.items() if delta}
+    if not changes:
+        return
+    with transaction.atomic():
+        summary = DashboardSummary.objects.select_for_update().filter(pk=SUMMARY_PK).first()
+        if summary is None:
+            try:
+                with transaction.atomic():
+                    DashboardSummary.objects.create(pk=SUMMARY_PK, counts=compute_summary(), version=1)
+                return
+            except IntegrityError:
+                # Another writer created the row first
+                summary = DashboardSummary.objects.select_for_update().get(pk=SUMMARY_PK)
+        _apply(summary.counts, changes)
+        summary.version = F('version') + 1
+        summary.save(update_fields=['counts', 'version', 'updated_at'])
+
+
+def business_changes(industry, status, sign):
+    return {
+        'businesses.total': sign,
+        f'businesses.by_status.{status}': sign,
+        f'businesses.by_industry.{industry}': sign,
+    }
+
+
+def investible_changes(status, sign):
+    return {'investibles.total': sign, f'investibles.by_status.{status}': sign}
+
+
+def instance_changes(instances, sign=1):
+    """
+    Returns the summary changes for creating (or with ``sign=-1`` deleting) ``instances``.
+    """
+    changes = Counter()
+    for instance in instances:
+        if isinstance(instance, Business):
+            changes.update(business_changes(instance.industry, instance.status, sign))
+        elif isinstance(instance, Investible):
+            changes.update(investible_changes(instance.status, sign))
+        elif isinstance(instance, Marker):
+            changes['markers.total'] += sign
+        elif isinstance(instance, Report):
+            changes['reports.total'] += sign
+        elif isinstance(instance, User):
+            changes['users.total'] += sign
+    return changes
+
+
+def get_summary():
+    """
+    Returns the summary row, creating it from a full count on first use.
+    """
+    summary = DashboardSummary.objects.filter(pk=SUMMARY_PK).first()
+    if summary is None:
+        try:
+            with transaction.atomic():
+                summary = DashboardSummary.objects.create(pk=SUMMARY_PK, counts=compute_summary(), version=1)
+        except IntegrityError:
+            summary = DashboardSummary.objects.get(pk=SUMMARY_PK)
+    return summary
+
+
+def check_summary(repair=False):
+    """
+    Returns ``(path, stored, actual)`` for every total that drifted from a fresh
+    count, overwriting the row with the fresh counts when ``repair`` is set.
+    """
+    with transaction.atomic():
+        summary = DashboardSummary.objects.select_for_update().filter(pk=SUMMARY_PK).first()
+        actual = compute_summary()
+        stored = summary.counts if summary else {}
+        drift = []
+
+        def compare(expected, found, prefix):
+            for key in sorted(set(expected) | set(found)):
+                path = f'{prefix}{key}'
+                value, current = expected.get(key, 0), found.get(key, 0)
+                if isinstance(value, dict) or isinstance(current, dict):
+                    compare(value or {}, current or {}, f'{path}.')
+                elif value != current:
+                    drift.append((path, current, value))
+
+        compare(actual, stored, '')
+        if repair and (drift or summary is None):
+            DashboardSummary.objects.update_or_create(
+                pk=SUMMARY_PK,
+                defaults={'counts': actual, 'version': (summary.version if summary else 0) + 1},
+            )
+    return drift
@@ -0,0 +1,90 @@
+import asyncio
+import itertools
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Events a slow subscriber may fall behind by before it is told to resync
+SUBSCRIBER_QUEUE_SIZE = 1000
+
+
+class InProcessBroker:
+    """
+    Fans marker change events out to the SSE subscribers of this process.
+
+    ``publish`` may be called from any thread (sync views run in worker
+    threads); events are handed to each subscriber's event loop. Swap in a
+    broker backed by an external pub/sub through ``MARKER_EVENT_BROKER`` to
+    reach subscribers connected to other workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._ids = itertools.count(1)
+
+    def publish(self, event):
+        with self._lock:
+            event = dict(event, id=next(self._ids))
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # The subscriber's loop has already shut down
+                pass
+
+    @staticmethod
+    def _deliver(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog; the client refetches instead of applying deltas
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({'op': 'resync', 'id': event['id']})
+
+    async def listen(self, heartbeat=None):
+        """
+        Yields published events, or ``None`` after ``heartbeat`` idle seconds.
+        """
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'MARKER_EVENT_BROKER', 'api.events.InProcessBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def publish_marker_upsert(data):
+    get_broker().publish({'op': 'upsert', 'marker': data})
+
+
+def publish_marker_delete(marker_id):
+    get_broker().publish({'op': 'delete', 'marker_id': marker_id})
+
+
+def publish_resync():
+    # Sent after bulk changes that were not published marker by marker
+    get_broker().publish({'op': 'resync'})
@@ -0,0 +1,282 @@
+import csv
+import json
+import re
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+from django.utils import timezone
+
+from .models import Marker
+
+# Rows are read in keyset batches of this size. MySQL's default client cursor
+# buffers a whole result set even under .iterator(), so batching on the
+# primary key is what keeps memory flat however large the table is.
+EXPORT_CHUNK_SIZE = 2000
+
+# (property name, ORM lookup) pairs written for every marker feature
+MARKER_EXPORT_FIELDS = (
+    ('marker_id', 'marker_id'),
+    ('label', 'label'),
+    ('business_id', 'business__business_id'),
+    ('bsns_name', 'business__bsns_name'),
+    ('bsns_address', 'business__bsns_address'),
+    ('industry', 'business__industry'),
+    ('business_status', 'business__status'),
+    ('investible_id', 'invst__investible_id'),
+    ('invst_location', 'invst__invst_location'),
+    ('invst_description', 'invst__invst_description'),
+    ('investible_status', 'invst__status'),
+    ('area', 'invst__area'),
+    ('preferred_business', 'invst__preferred_business'),
+    ('landmark', 'invst__landmark'),
+    ('contact_person', 'invst__contact_person'),
+    ('contact_number', 'invst__contact_number'),
+)
+
+# (column name, ORM lookup) pairs for the tabular exports; the primary key comes first
+BUSINESS_EXPORT_FIELDS = (
+    ('business_id', 'business_id'),
+    ('bsns_name', 'bsns_name'),
+    ('bsns_address', 'bsns_address'),
+    ('industry', 'industry'),
+    ('status', 'status'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+
+INVESTIBLE_EXPORT_FIELDS = (
+    ('investible_id', 'investible_id'),
+    ('invst_location', 'invst_location'),
+    ('invst_description', 'invst_description'),
+    ('status', 'status'),
+    ('area', 'area'),
+    ('preferred_business', 'preferred_business'),
+    ('landmark', 'landmark'),
+    ('contact_person', 'contact_person'),
+    ('contact_number', 'contact_number'),
+    ('created_at', 'created_at'),
+    ('updated_at', 'updated_at'),
+)
+
+REPORT_EXPORT_FIELDS = (
+    ('report_id', 'report_id'),
+    ('report_date', 'report_date'),
+    ('report_description', 'report_description'),
+    ('business_id', 'business_id'),
+    ('bsns_name', 'business__bsns_name'),
+    ('investible_id', 'investible_id'),
+    ('invst_location', 'investible__invst_location'),
+)
+
+
+def iter_keyset_batches(queryset, pk_field, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields ``values_list`` rows of ``fields`` in primary key order, one batch query
+    at a time. The primary key must be the first of ``fields``.
+    """
+    queryset = queryset.order_by(pk_field).values_list(*fields)
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(**{f'{pk_field}__gt': last_pk})
+        rows = list(batch[:chunk_size])
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+
+def iter_marker_geojson(queryset=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields a GeoJSON FeatureCollection of markers, one feature per chunk of text.
+    """
+    if queryset is None:
+        queryset = Marker.objects.all()
+    names = [name for name, _ in MARKER_EXPORT_FIELDS]
+    lookups = [lookup for _, lookup in MARKER_EXPORT_FIELDS]
+    rows = iter_keyset_batches(queryset, 'marker_id', lookups + ['latitude', 'longitude'], chunk_size)
+
+    yield '{"type":"FeatureCollection","features":['
+    separator = ''
+    for *values, latitude, longitude in rows:
+        feature = {
+            'type': 'Feature',
+            'id': values[0],
+            'geometry': {'type': 'Point', 'coordinates': [longitude, latitude]},
+            'properties': dict(zip(names, values)),
+        }
+        yield separator + json.dumps(feature, separators=(',', ':'))
+        separator = ','
+    yield ']}'
+
+
+def _local(value):
+    # Aware datetimes are written in the site's time zone, without an offset
+    return timezone.localtime(value).replace(tzinfo=None) if timezone.is_aware(value) else value
+
+
+class _Echo:
+    """
+    File-like object whose ``write`` hands the text back, so csv.writer
+    produces one string per row instead of filling a buffer.
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, export_fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields ``export_fields`` of ``queryset`` as CSV, one row per chunk of text.
+    """
+    writer = csv.writer(_Echo())
+    # A byte order mark so Excel reads the file as UTF-8
+    yield '\ufeff' + writer.writerow([name for name, _ in export_fields])
+    pk_field = export_fields[0][1]
+    rows = iter_keyset_batches(queryset, pk_field, [lookup for _, lookup in export_fields], chunk_size)
+    for row in rows:
+        yield writer.writerow([
+            _local(value).isoformat(sep=' ') if isinstance(value, datetime) else value
+            for value in row
+        ])
+
+
+# Excel's cell text limit and the control characters XML 1.0 cannot carry
+XLSX_MAX_TEXT = 32767
+_XML_ILLEGAL = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# Day zero of Excel's 1900 date system (1899-12-30 absorbs its leap-year bug)
+_XLSX_EPOCH = datetime(1899, 12, 30)
+
+# The fixed workbook parts around the single streamed worksheet. Style 1 is a
+# date-time format for datetime cells; every string is written inline, so no
+# shared string table has to be held in memory.
+_XLSX_PARTS = (
+    ('[Content_Types].xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+     '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+     '<Default Extension="xml" ContentType="application/xml"/>'
+     '<Override PartName="/xl/workbook.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+     '<Override PartName="/xl/worksheets/sheet1.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+     '<Override PartName="/xl/styles.xml" '
+     'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+     '</Types>'),
+    ('_rels/.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+     'Target="xl/workbook.xml"/>'
+     '</Relationships>'),
+    ('xl/_rels/workbook.xml.rels',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+     '<Relationship Id="rId1" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+     'Target="worksheets/sheet1.xml"/>'
+     '<Relationship Id="rId2" '
+     'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+     'Target="styles.xml"/>'
+     '</Relationships>'),
+    ('xl/styles.xml',
+     '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+     '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+     '<numFmts count="1"><numFmt numFmtId="164" formatCode="yyyy-mm-dd hh:mm:ss"/></numFmts>'
+     '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+     '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+     '<fill><patternFill patternType="gray125"/></fill></fills>'
+     '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+     '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+     '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+     '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/></cellXfs>'
+     '</styleSheet>'),
+)
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+
+def _column(index):
+    letters = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_cell(ref, value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        serial = (_local(value) - _XLSX_EPOCH).total_seconds() / 86400
+        return f'<c r="{ref}" s="1"><v>{serial!r}</v></c>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    text = escape(_XML_ILLEGAL.sub('', str(value))[:XLSX_MAX_TEXT])
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number, values):
+    cells = ''.join(_xlsx_cell(f'{_column(index)}{number}', value) for index, value in enumerate(values))
+    return f'<row r="{number}">{cells}</row>'
+
+
+class _ZipStream:
+    """
+    Write-only file object that collects what zipfile writes until the
+    generator drains it. Having no ``tell``/``seek`` makes zipfile write
+    streaming-safe data descriptors instead of seeking back into the archive.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_xlsx(queryset, export_fields, sheet_name, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields a one-sheet XLSX workbook of ``export_fields`` as it is compressed,
+    so only the rows of the current batch are ever held in memory.
+    """
+    stream = _ZipStream()
+    pk_field = export_fields[0][1]
+    rows = iter_keyset_batches(queryset, pk_field, [lookup for _, lookup in export_fields], chunk_size)
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_PARTS:
+            archive.writestr(name, content)
+        archive.writestr('xl/workbook.xml', _XLSX_WORKBOOK.format(name=escape(sheet_name, {'"': '&quot;'})))
+        yield stream.drain()
+        # zip64 up front, since the sheet's final size is unknown while streaming
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(1, [name for name, _ in export_fields]).encode())
+            for number, row in enumerate(rows, start=2):
+                sheet.write(_xlsx_row(number, row).encode())
+                data = stream.drain()
+                if data:
+                    yield data
+            sheet.write(b'</sheetData></worksheet>')
+    yield stream.drain()
@@ -0,0 +1,37 @@
+from django.db.models import Q
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+
+class QueryParamFilter(BaseFilterBackend):
+    """
+    Applies the view's ``filter_params`` (``{param: ORM lookup}``) as filters,
+    e.g. ``?industry=mall`` -> ``business__industry='mall'``. A comma-separated
+    value matches any of its parts; a tuple of lookups matches on any of them.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        for param, lookup in getattr(view, 'filter_params', {}).items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            lookups = lookup if isinstance(lookup, tuple) else (lookup,)
+            condition = Q()
+            for part in value.split(','):
+                for name in lookups:
+                    condition |= Q(**{name: part.strip()})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+class StableOrderingFilter(OrderingFilter):
+    """
+    ``?ordering=`` over the view's ``ordering_fields``, with the primary key
+    appended as a tie-breaker so equal values keep a deterministic order
+    (cursor pages rely on it).
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not any(field.lstrip('-') == 'pk' for field in ordering):
+            ordering = [*ordering, 'pk']
+        return ordering
@@ -0,0 +1,168 @@
+import math
+
+from django.db.models import Q
+
+from .spatial import EARTH_RADIUS_M
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Stored precision; 9 characters is a cell of about 4.8 m x 4.8 m
+GEOHASH_PRECISION = 9
+
+# Bbox covers never use more prefix ranges than this; coarser cells are used instead
+MAX_COVER_CELLS = 16
+
+_DECODE = {char: index for index, char in enumerate(BASE32)}
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        # Bits alternate between longitude (even) and latitude (odd)
+        target, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (target[0] + target[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            target[0] = middle
+        else:
+            target[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def bounds(geohash):
+    """
+    Returns the ``(min_lon, min_lat, max_lon, max_lat)`` of a geohash cell.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _DECODE[char]
+        for shift in range(4, -1, -1):
+            target = lon_range if even else lat_range
+            middle = (target[0] + target[1]) / 2
+            if value >> shift & 1:
+                target[0] = middle
+            else:
+                target[1] = middle
+            even = not even
+    return lon_range[0], lat_range[0], lon_range[1], lat_range[1]
+
+
+def cell_size(precision):
+    """
+    Returns the ``(lon_degrees, lat_degrees)`` of a cell at ``precision``.
+    """
+    lon_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 360.0 / 2 ** lon_bits, 180.0 / 2 ** lat_bits
+
+
+def neighbours(geohash):
+    """
+    Returns the up to eight cells of the same precision around ``geohash``.
+    """
+    min_lon, min_lat, max_lon, max_lat = bounds(geohash)
+    lon_step, lat_step = max_lon - min_lon, max_lat - min_lat
+    center_lon, center_lat = (min_lon + max_lon) / 2, (min_lat + max_lat) / 2
+    cells = []
+    for d_lat in (-1, 0, 1):
+        latitude = center_lat + d_lat * lat_step
+        if not -90 < latitude < 90:
+            continue
+        for d_lon in (-1, 0, 1):
+            if d_lat or d_lon:
+                longitude = (center_lon + d_lon * lon_step + 180) % 360 - 180
+                cells.append(encode(latitude, longitude, len(geohash)))
+    return cells
+
+
+def cover(min_lon, min_lat, max_lon, max_lat, max_cells=MAX_COVER_CELLS):
+    """
+    Returns the geohash prefixes of the finest precision whose cells cover a
+    bbox in at most ``max_cells`` cells; empty when even one-character cells
+    would take more, in which case a prefix filter would not narrow anything.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lon_step, lat_step = cell_size(precision)
+        cols = math.floor(max_lon / lon_step) - math.floor(min_lon / lon_step) + 1
+        rows = math.floor(max_lat / lat_step) - math.floor(min_lat / lat_step) + 1
+        if rows * cols <= max_cells:
+            break
+    else:
+        return []
+    prefixes = set()
+    for row in range(rows):
+        latitude = min(min_lat + row * lat_step, max_lat)
+        for col in range(cols):
+            prefixes.add(encode(latitude, min(min_lon + col * lon_step, max_lon), precision))
+    prefixes.add(encode(max_lat, max_lon, precision))
+    return sorted(prefixes)
+
+
+def near(latitude, longitude, radius_m):
+    """
+    Returns the prefixes covering a circle: the cell holding the center at the
+    finest precision whose cells span the radius, plus its neighbours.
+    """
+    angular = radius_m / EARTH_RADIUS_M
+    cos_lat = math.cos(math.radians(latitude))
+    ratio = math.sin(angular) / cos_lat if cos_lat > 1e-12 else 2.0
+    lat_span = math.degrees(angular)
+    lon_span = math.degrees(math.asin(ratio)) if ratio < 1 else 360.0
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lon_step, lat_step = cell_size(precision)
+        if lon_step >= lon_span and lat_step >= lat_span:
+            center = encode(latitude, longitude, precision)
+            return [center] + neighbours(center)
+    return []
+
+
+def _successor(prefix):
+    """
+    Returns the smallest string above every geohash starting with ``prefix``,
+    or ``None`` when there is none (a run of trailing 'z').
+    """
+    prefix = prefix.rstrip(BASE32[-1])
+    if not prefix:
+        return None
+    return prefix[:-1] + BASE32[_DECODE[prefix[-1]] + 1]
+
+
+def prefix_q(prefixes, field='geohash'):
+    """
+    Returns a Q matching rows whose ``field`` starts with any of ``prefixes``,
+    written as plain ``>=``/``<`` ranges so MySQL range-scans the B-tree index
+    (Django's startswith becomes ``LIKE BINARY``, which can bypass it). No
+    prefixes give an empty Q, which leaves a queryset unfiltered.
+    """
+    query = Q()
+    for prefix in prefixes:
+        upper = _successor(prefix)
+        condition = Q(**{f'{field}__gte': prefix})
+        if upper is not None:
+            condition &= Q(**{f'{field}__lt': upper})
+        query |= condition
+    return query
+
+
+def bbox_q(min_lon, min_lat, max_lon, max_lat):
+    """
+    Returns a Q selecting markers inside a bbox: geohash prefix ranges narrow
+    both axes on the geohash index, and the coordinate ranges trim the cells' overhang.
+    """
+    return prefix_q(cover(min_lon, min_lat, max_lon, max_lat)) & Q(
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lon, max_lon),
+    )
@@ -0,0 +1,198 @@
+import math
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+
+from .boundary import get_boundary_bbox
+from .models import DensityCell, Marker
+from .spatial import EARTH_RADIUS_M
+
+# Cell edges (meters) counters are maintained for; /api/heatmap/ serves only these
+HEATMAP_CELL_SIZES = (100, 250, 500, 1000)
+
+METERS_PER_DEGREE_LAT = math.pi * EARTH_RADIUS_M / 180
+
+# Counters incremented per UPDATE statement by apply_deltas()
+DELTA_BATCH_SIZE = 500
+
+# Marker columns a counter key is derived from; see marker_keys()
+MARKER_STATE_FIELDS = (
+    'latitude', 'longitude', 'business_id', 'business__industry', 'business__status', 'invst__status',
+)
+
+
+def _grid():
+    """
+    Returns the grid origin and meters per degree of longitude. The grid is a
+    local equirectangular projection anchored at the boundary bbox's south-west
+    corner, which is accurate to well under a cell at city scale.
+    """
+    min_lon, min_lat, max_lon, max_lat = get_boundary_bbox()
+    meters_per_degree_lon = METERS_PER_DEGREE_LAT * math.cos(math.radians((min_lat + max_lat) / 2))
+    return min_lon, min_lat, max_lon, max_lat, meters_per_degree_lon
+
+
+def cell_of(latitude, longitude, cell_size):
+    """
+    Returns the ``(row, col)`` containing a point, or ``None`` outside the boundary bbox.
+    """
+    min_lon, min_lat, max_lon, max_lat, meters_per_degree_lon = _grid()
+    if not (min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon):
+        return None
+    return (
+        math.floor((latitude - min_lat) * METERS_PER_DEGREE_LAT / cell_size),
+        math.floor((longitude - min_lon) * meters_per_degree_lon / cell_size),
+    )
+
+
+def cell_bounds(row, col, cell_size):
+    """
+    Returns the ``(min_lon, min_lat, max_lon, max_lat)`` of a grid cell.
+    """
+    min_lon, min_lat, _, _, meters_per_degree_lon = _grid()
+    lat_step = cell_size / METERS_PER_DEGREE_LAT
+    lon_step = cell_size / meters_per_degree_lon
+    return (
+        min_lon + col * lon_step,
+        min_lat + row * lat_step,
+        min_lon + (col + 1) * lon_step,
+        min_lat + (row + 1) * lat_step,
+    )
+
+
+def marker_keys(latitude, longitude, business_id, industry, business_status, investible_status):
+    """
+    Returns the DensityCell keys a marker in this state counts towards, one per cell size.
+    """
+    if business_id is not None:
+        kind, status = 'business', business_status
+    elif investible_status is not None:
+        kind, industry, status = 'investible', '', investible_status
+    else:
+        return []
+    keys = []
+    for cell_size in HEATMAP_CELL_SIZES:
+        cell = cell_of(latitude, longitude, cell_size)
+        if cell is not None:
+            keys.append((cell_size, kind, industry or '', status, *cell))
+    return keys
+
+
+def marker_state(marker_id):
+    return Marker.objects.filter(pk=marker_id).values_list(*MARKER_STATE_FIELDS).first()
+
+
+def state_deltas(removed=(), added=()):
+    """
+    Returns the counter changes for markers moving out of the ``removed`` and
+    into the ``added`` states; keys that cancel out are dropped.
+    """
+    deltas = Counter()
+    for state in removed:
+        if state:
+            deltas.subtract(marker_keys(*state))
+    for state in added:
+        if state:
+            deltas.update(marker_keys(*state))
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def _cell_ids(keys):
+    """
+    Returns ``{key: pk}`` for the existing cells among ``keys``, read with one query.
+    """
+    fields = ('cell_size', 'kind', 'industry', 'status', 'row', 'col')
+    query = Q()
+    for cell_size in {key[0] for key in keys}:
+        rows = [key[4] for key in keys if key[0] == cell_size]
+        cols = [key[5] for key in keys if key[0] == cell_size]
+        query |= Q(cell_size=cell_size, row__range=(min(rows), max(rows)), col__range=(min(cols), max(cols)))
+    cells = DensityCell.objects.filter(
+        query,
+        kind__in={key[1] for key in keys},
+        industry__in={key[2] for key in keys},
+        status__in={key[3] for key in keys},
+    ).values_list('pk', *fields)
+    keys = set(keys)
+    found = {}
+    for pk, *values in cells:
+        if tuple(values) in keys:
+            found[tuple(values)] = pk
+    return found
+
+
+def apply_deltas(deltas):
+    """
+    Adds ``deltas`` (``{key: change}``) to the counters. Missing cells are
+    created first, then every cell is incremented by one bulk UPDATE whose
+    ``count = count + delta`` keeps concurrent writers from losing changes.
+    """
+    if not deltas:
+        return
+    fields = ('cell_size', 'kind', 'industry', 'status', 'row', 'col')
+    with transaction.atomic():
+        ids = _cell_ids(list(deltas))
+        missing = [key for key in deltas if key not in ids]
+        if missing:
+            # A conflict means another writer created the cell first
+            DensityCell.objects.bulk_create(
+                [DensityCell(count=0, **dict(zip(fields, key))) for key in missing],
+                ignore_conflicts=True,
+            )
+            ids = _cell_ids(list(deltas))
+        DensityCell.objects.bulk_update(
+            [DensityCell(pk=ids[key], count=F('count') + delta) for key, delta in deltas.items()],
+            ['count'],
+            batch_size=DELTA_BATCH_SIZE,
+        )
+
+
+def rebuild_heatmap(batch_size=2000):
+    """
+    Recounts every cell from the Marker table; returns the number of cells written.
+    """
+    counts = Counter()
+    for state in Marker.objects.values_list(*MARKER_STATE_FIELDS).iterator(chunk_size=batch_size):
+        counts.update(marker_keys(*state))
+    fields = ('cell_size', 'kind', 'industry', 'status', 'row', 'col')
+    with transaction.atomic():
+        DensityCell.objects.all().delete()
+        DensityCell.objects.bulk_create(
+            (DensityCell(count=count, **dict(zip(fields, key))) for key, count in counts.items()),
+            batch_size=batch_size,
+        )
+    return len(counts)
+
+
+def heatmap(cell_size, kind=None, industry=None, status=None):
+    """
+    Returns the non-empty cells of the ``cell_size`` grid with their marker
+    counts, optionally restricted to a marker kind, industry or status.
+    """
+    cells = DensityCell.objects.filter(cell_size=cell_size)
+    if kind:
+        cells = cells.filter(kind=kind)
+    if industry:
+        cells = cells.filter(industry=industry)
+    if status:
+        cells = cells.filter(status=status)
+    rows = cells.values_list('row', 'col').annotate(total=Sum('count')).filter(total__gt=0).order_by()
+
+    results = []
+    for row, col, total in rows:
+        min_lon, min_lat, max_lon, max_lat = cell_bounds(row, col, cell_size)
+        results.append({
+            'row': row,
+            'col': col,
+            'latitude': (min_lat + max_lat) / 2,
+            'longitude': (min_lon + max_lon) / 2,
+            'bounds': [min_lon, min_lat, max_lon, max_lat],
+            'count': total,
+        })
+    return {
+        'cell': cell_size,
+        'bbox': list(get_boundary_bbox()),
+        'max': max((cell['count'] for cell in results), default=0),
+        'cells': results,
+    }
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.dashboard import check_summary
+
+
+class Command(BaseCommand):
+    help = 'Compares the dashboard summary row with a fresh count, optionally repairing drift.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repair', action='store_true', help='Overwrite the row with the fresh counts.')
+
+    def handle(self, *args, **options):
+        drift = check_summary(repair=options['repair'])
+        for path, stored, actual in drift:
+            self.stdout.write(f'{path}: stored {stored}, actual {actual}')
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Dashboard summary is consistent.'))
+        elif options['repair']:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {len(drift)} totals.'))
+        else:
+            self.stdout.write(self.style.WARNING(f'{len(drift)} totals drifted; rerun with --repair to fix them.'))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.db.models.functions import Substr
+
+from api.geohash import GEOHASH_PRECISION, prefix_q
+from api.models import Marker
+
+
+class Command(BaseCommand):
+    help = 'Lists markers sharing a geohash cell, i.e. likely duplicate pins.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--precision', type=int, default=GEOHASH_PRECISION,
+            help='Geohash length to group on; 9 is ~5 m cells, 8 is ~38 x 19 m.',
+        )
+
+    def handle(self, *args, **options):
+        precision = options['precision']
+        if not 1 <= precision <= GEOHASH_PRECISION:
+            raise CommandError(f'--precision must be between 1 and {GEOHASH_PRECISION}.')
+        cells = (
+            Marker.objects.annotate(cell=Substr('geohash', 1, precision))
+            .values('cell')
+            .annotate(markers=Count('pk'))
+            .filter(markers__gt=1)
+            .order_by('cell')
+        )
+        groups = 0
+        for row in cells.iterator():
+            # Each group is read back with one prefix range scan on the geohash index
+            markers = Marker.objects.filter(prefix_q([row['cell']])).values_list('marker_id', 'label')
+            self.stdout.write(f"{row['cell']}: " + ', '.join(f'{pk} ({label})' for pk, label in markers))
+            groups += 1
+        self.stdout.write(self.style.SUCCESS(f'{groups} cells hold more than one marker.'))
@@ -0,0 +1,143 @@
+import csv
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from api.serializers import MarkerPlacementSerializer, place_markers
+from api.signals import bulk_import
+
+BUSINESS_FIELDS = ('bsns_name', 'bsns_address', 'industry', 'status')
+INVESTIBLE_FIELDS = (
+    'invst_location', 'invst_description', 'status', 'area',
+    'preferred_business', 'landmark', 'contact_person', 'contact_number',
+)
+
+
+def iter_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        for row in csv.DictReader(handle):
+            yield row.get('latitude'), row.get('longitude'), row
+
+
+def iter_geojson_features(features):
+    for feature in features:
+        feature = feature if isinstance(feature, dict) else {}
+        coordinates = (feature.get('geometry') or {}).get('coordinates')
+        # A position may carry an altitude; anything that is not a position fails
+        # validation below and is skipped like a bad CSV row
+        if isinstance(coordinates, list) and len(coordinates) >= 2:
+            longitude, latitude = coordinates[:2]
+        else:
+            longitude = latitude = None
+        yield latitude, longitude, feature.get('properties') or {}
+
+
+def iter_geojson(path):
+    with open(path, encoding='utf-8') as handle:
+        yield from iter_geojson_features(json.load(handle).get('features', []))
+
+
+def iter_geojson_lines(path):
+    # Newline-delimited features are streamed; a FeatureCollection has to be parsed whole
+    with open(path, encoding='utf-8') as handle:
+        yield from iter_geojson_features(json.loads(line) for line in handle if line.strip())
+
+
+READERS = {
+    '.csv': iter_csv,
+    '.geojson': iter_geojson,
+    '.json': iter_geojson,
+    '.geojsonl': iter_geojson_lines,
+    '.ndjson': iter_geojson_lines,
+}
+
+
+def to_placement(latitude, longitude, properties):
+    """
+    Maps a flat row onto the MarkerPlacementSerializer payload shape. Rows are
+    businesses when they say so in ``type`` or carry a ``bsns_name``.
+    """
+    kind = properties.get('type') or ('business' if properties.get('bsns_name') else 'investible')
+    fields = BUSINESS_FIELDS if kind == 'business' else INVESTIBLE_FIELDS
+    item = {
+        'latitude': latitude,
+        'longitude': longitude,
+        kind: {field: properties[field] for field in fields if properties.get(field) not in (None, '')},
+    }
+    if properties.get('label'):
+        item['label'] = properties['label']
+    return item
+
+
+class Command(BaseCommand):
+    help = 'Imports businesses, investibles and their markers from a CSV or GeoJSON file in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--checkpoint',
+            help='File recording how many rows have been committed (default: <file>.checkpoint).',
+        )
+        parser.add_argument('--restart', action='store_true', help='Ignore an existing checkpoint.')
+
+    def handle(self, *args, **options):
+        path = Path(options['file'])
+        reader = READERS.get(path.suffix.lower())
+        if reader is None:
+            raise CommandError(f'Unsupported file type {path.suffix!r}; expected one of {", ".join(READERS)}.')
+        if not path.exists():
+            raise CommandError(f'{path} does not exist.')
+        batch_size = options['batch_size']
+        checkpoint = Path(options['checkpoint'] or f'{path}.checkpoint')
+
+        start_row = 0
+        if checkpoint.exists() and not options['restart']:
+            start_row = int(checkpoint.read_text().strip() or 0)
+            self.stdout.write(f'Resuming after row {start_row}.')
+
+        # One serializer validates every row, so BusinessSerializer and
+        # InvestibleSerializer rules apply without building one per row.
+        validator = MarkerPlacementSerializer()
+        batch = []
+        imported = skipped = 0
+        row_number = 0
+        started = time.monotonic()
+
+        def flush():
+            nonlocal imported
+            if batch:
+                place_markers(batch)
+                imported += len(batch)
+                batch.clear()
+            checkpoint.write_text(str(row_number))
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'{row_number} rows read, {imported} imported, {skipped} skipped, '
+                f'{imported / elapsed if elapsed else 0:.0f} markers/s'
+            )
+
+        # Catchments, heatmap counters, tiles and marker events are rebuilt once
+        # at the end rather than per batch
+        with bulk_import():
+            for row_number, (latitude, longitude, properties) in enumerate(reader(path), start=1):
+                if row_number <= start_row:
+                    continue
+                try:
+                    batch.append(validator.run_validation(to_placement(latitude, longitude, properties)))
+                except ValidationError as exc:
+                    skipped += 1
+                    if options['verbosity'] > 1:
+                        self.stderr.write(f'Row {row_number}: {exc.detail}')
+                if len(batch) >= batch_size:
+                    flush()
+            flush()
+            self.stdout.write('Rebuilding catchments, heatmap and tiles.')
+
+        checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} markers ({skipped} rows skipped) in {time.monotonic() - started:.1f}s.'
+        ))
@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from api.boundary import polygon_parts, reclassify_markers, reset_zone_index
+from api.conditional import bump_version
+from api.models import Marker, Zone
+
+
+class Command(BaseCommand):
+    help = 'Loads barangay/zone polygons from a GeoJSON file and reassigns markers to them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file')
+        parser.add_argument('--name-property', default='name', help='Feature property holding the zone name.')
+        parser.add_argument('--replace', action='store_true', help='Delete zones missing from the file.')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['file'], encoding='utf-8') as handle:
+                features = json.load(handle).get('features', [])
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read {options["file"]}: {exc}')
+
+        zones = {}
+        for feature in features:
+            name = (feature.get('properties') or {}).get(options['name_property'])
+            if name and polygon_parts(feature.get('geometry')):
+                zones[str(name)] = feature['geometry']
+        if not zones:
+            raise CommandError(f'No polygon features with a {options["name_property"]!r} property.')
+
+        with transaction.atomic():
+            for name, geometry in zones.items():
+                Zone.objects.update_or_create(name=name, defaults={'geometry': geometry})
+            if options['replace']:
+                stale = Zone.objects.exclude(name__in=zones)
+                # Clear the markers' zone here rather than through SET_NULL, which
+                # neither stamps updated_at for /api/sync/ nor bumps the Marker version
+                if Marker.objects.filter(zone__in=stale).update(zone=None, updated_at=timezone.now()):
+                    bump_version(Marker)
+                stale.delete()
+            bump_version(Zone)
+        reset_zone_index()
+
+        updated = reclassify_markers()
+        self.stdout.write(self.style.SUCCESS(f'Loaded {len(zones)} zones; reassigned {updated} markers.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.catchment import CATCHMENT_CHUNK_SIZE, compute_catchments
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the cached nearby-business catchment of every investible.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CATCHMENT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        written = compute_catchments(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Computed {written} catchments.'))
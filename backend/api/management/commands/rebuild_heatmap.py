@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.heatmap import rebuild_heatmap
+
+
+class Command(BaseCommand):
+    help = 'Recounts the per-cell marker counters behind /api/heatmap/.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        written = rebuild_heatmap(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} cells.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.report_rollups import rebuild_report_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the per-day report rollups behind /api/stats/reports/ from the Report table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        written = rebuild_report_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} rollup rows.'))
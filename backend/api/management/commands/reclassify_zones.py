@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.boundary import reclassify_markers
+
+
+class Command(BaseCommand):
+    help = 'Reassigns every marker to the zone polygon containing it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        updated = reclassify_markers(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Reassigned {updated} markers.'))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_investible_area_investible_contact_number_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='marker',
+            index=models.Index(fields=['latitude', 'longitude'], name='marker_lat_lon_idx'),
+        ),
+    ]
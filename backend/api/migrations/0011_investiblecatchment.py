@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvestibleCatchment',
+            fields=[
+                ('investible', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='catchment', serialize=False, to='api.investible')),
+                ('counts', models.JSONField(default=dict)),
+                ('preferred_industry', models.CharField(blank=True, max_length=100, null=True)),
+                ('score', models.FloatField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
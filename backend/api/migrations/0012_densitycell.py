@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_investiblecatchment'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DensityCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cell_size', models.PositiveIntegerField()),
+                ('kind', models.CharField(choices=[('business', 'Business'), ('investible', 'Investible')], max_length=20)),
+                ('industry', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(max_length=10)),
+                ('row', models.IntegerField()),
+                ('col', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('cell_size', 'kind', 'industry', 'status', 'row', 'col'), name='density_cell_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:05
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 2000
+
+# Frozen copy of api.geohash.encode at 9 characters, so later changes to the
+# app module cannot change what this migration writes
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+
+def encode(latitude, longitude):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < GEOHASH_PRECISION:
+        target, coordinate = (lon_range, longitude) if even else (lat_range, latitude)
+        middle = (target[0] + target[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            target[0] = middle
+        else:
+            target[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(BASE32[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def backfill_geohash(apps, schema_editor):
+    Marker = apps.get_model('api', 'Marker')
+    last_pk = 0
+    while True:
+        batch = list(
+            Marker.objects.filter(marker_id__gt=last_pk)
+            .order_by('marker_id')
+            .only('marker_id', 'latitude', 'longitude')[:BACKFILL_BATCH_SIZE]
+        )
+        if not batch:
+            return
+        for marker in batch:
+            marker.geohash = encode(marker.latitude, marker.longitude)
+        Marker.objects.bulk_update(batch, ['geohash'])
+        last_pk = batch[-1].marker_id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_zones'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='marker',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_marker_geohash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='business',
+            index=models.Index(fields=['status', 'industry'], name='business_status_industry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='investible',
+            index=models.Index(fields=['status', 'area'], name='investible_status_area_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['report_date'], name='report_date_idx'),
+        ),
+    ]
@@ -90,6 +90,16 @@ class Business(models.Model):
         default='active'
     )
 
+    # Indexed for incremental sync (/api/sync/)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # ?status= / ?status=&industry= list filters (api/filters.py)
+            models.Index(fields=['status', 'industry'], name='business_status_industry_idx'),
+        ]
+
     def __str__(self):
         return self.bsns_name
 
@@ -115,17 +125,50 @@ class Investible(models.Model):
     contact_person = models.CharField(max_length=255, blank=True, null=True)
     contact_number = models.CharField(max_length=50, blank=True, null=True)
 
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # ?status= / ?status=&area= list filters (api/filters.py)
+            models.Index(fields=['status', 'area'], name='investible_status_area_idx'),
+        ]
+
 # class Meta:
 #       db_table = 'tbl_investibles'
 
 
+class Zone(models.Model):
+    # Barangay/zone polygons loaded with `manage.py load_zones`; markers are
+    # assigned to the zone containing them (see api/boundary.py).
+    zone_id = models.AutoField(primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    geometry = models.JSONField()
+
+    def __str__(self):
+        return self.name
+
+
 class Marker(models.Model):
     marker_id = models.AutoField(primary_key=True, default=None)
     label = models.CharField(max_length=100)
     business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='business_markers', null=True, blank=False)
     invst = models.ForeignKey(Investible, on_delete=models.CASCADE, related_name='investment_markers', null=True, blank=False)
+    # Set from the marker's position on save; replaces matching on Investible.area
+    zone = models.ForeignKey(Zone, on_delete=models.SET_NULL, related_name='markers', null=True, blank=True)
+    # Set from the position on save (api/geohash.py); prefix ranges on its index
+    # narrow bbox and radius filters without a spatial extension
+    geohash = models.CharField(max_length=12, blank=True, default='', db_index=True)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Viewport (bbox) queries range-scan latitude and filter longitude from the same index
+            models.Index(fields=['latitude', 'longitude'], name='marker_lat_lon_idx'),
+        ]
 
     def __str__(self):
         return self.label
@@ -140,6 +183,147 @@ class Report(models.Model):
     investible = models.ForeignKey(Investible, on_delete=models.CASCADE, related_name='reports', null=True, blank=False)
     business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='reports', null=True, blank=False)
 
+    class Meta:
+        indexes = [
+            # Date-range report listings and rollups
+            models.Index(fields=['report_date'], name='report_date_idx'),
+        ]
+
 
 # class Meta:
-#       db_table = 'tbl_reports'
\ No newline at end of file
+#       db_table = 'tbl_reports'
+
+class ModelVersion(models.Model):
+    # Bumped by the post_save/post_delete handlers in signals.py; read to answer
+    # conditional GETs without querying the versioned table itself.
+    model = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.model} v{self.version}'
+
+
+class Tombstone(models.Model):
+    # Written by the post_delete handlers in signals.py so /api/sync/ can report
+    # deletions, including business/investible rows removed with their last marker.
+    MODEL_CHOICES = (
+        ('marker', 'Marker'),
+        ('business', 'Business'),
+        ('investible', 'Investible'),
+    )
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.IntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
+
+
+class SearchDocument(models.Model):
+    # Trigram index for /api/search/, maintained by the signal handlers in
+    # signals.py and rebuilt with `manage.py rebuild_search_index`.
+    MODEL_CHOICES = (
+        ('business', 'Business'),
+        ('investible', 'Investible'),
+    )
+
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.IntegerField()
+    trigram_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'object_id'], name='search_document_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.model} {self.object_id}'
+
+
+class SearchTrigram(models.Model):
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['trigram', 'document'], name='search_trigram_idx'),
+        ]
+
+
+class InvestibleCatchment(models.Model):
+    # Nearby business counts per radius, maintained by api/catchment.py and
+    # served at /api/investibles/<id>/catchment/.
+    investible = models.OneToOneField(
+        Investible, on_delete=models.CASCADE, primary_key=True, related_name='catchment'
+    )
+    counts = models.JSONField(default=dict)
+    preferred_industry = models.CharField(max_length=100, blank=True, null=True)
+    score = models.FloatField(blank=True, null=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Catchment of investible {self.investible_id}'
+
+
+class DensityCell(models.Model):
+    # Per-cell marker counters behind /api/heatmap/, kept current by the signal
+    # handlers in signals.py and rebuilt with `manage.py rebuild_heatmap`.
+    KIND_CHOICES = (
+        ('business', 'Business'),
+        ('investible', 'Investible'),
+    )
+
+    cell_size = models.PositiveIntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    industry = models.CharField(max_length=100, blank=True, default='')
+    status = models.CharField(max_length=10)
+    row = models.IntegerField()
+    col = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # Also serves the per-size/kind/industry/status reads of the heatmap view
+            models.UniqueConstraint(
+                fields=['cell_size', 'kind', 'industry', 'status', 'row', 'col'],
+                name='density_cell_key_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.cell_size}m ({self.row}, {self.col}) {self.kind}: {self.count}'
+
+
+class ReportRollup(models.Model):
+    # Report counts per day, business and investible behind /api/stats/reports/,
+    # kept by the signal handlers in signals.py and rebuilt with
+    # `manage.py rebuild_report_rollups`. Rows are summed when read, so
+    # concurrent writers may split one key across rows.
+    day = models.DateField()
+    business = models.ForeignKey(Business, on_delete=models.CASCADE, related_name='+', null=True)
+    investible = models.ForeignKey(Investible, on_delete=models.CASCADE, related_name='+', null=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['day'], name='report_rollup_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.day}: {self.count}'
+
+
+class DashboardSummary(models.Model):
+    # Single row (pk=1) of dashboard totals behind /api/dashboard/summary/,
+    # adjusted by the signal handlers in signals.py; `version` is bumped on
+    # every change and serves as the ETag. `manage.py check_dashboard_summary`
+    # compares it with a fresh count.
+    id = models.PositiveSmallIntegerField(primary_key=True, default=1)
+    counts = models.JSONField(default=dict)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'Dashboard summary v{self.version}'
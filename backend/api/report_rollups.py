@@ -0,0 +1,92 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .exports import iter_keyset_batches
+from .models import Report, ReportRollup
+
+# Bucket name -> function truncating the rollup day; days are already day buckets
+BUCKETS = {
+    'day': None,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+
+def rollup_key(report_date, business_id, investible_id):
+    return timezone.localdate(report_date), business_id, investible_id
+
+
+def adjust_rollup(key, delta):
+    """
+    Adds ``delta`` reports to the rollup row for ``(day, business_id, investible_id)``.
+    """
+    day, business_id, investible_id = key
+    rows = ReportRollup.objects.filter(day=day, business_id=business_id, investible_id=investible_id)
+    # Update a single row: the key is not unique (NULL ids cannot be), see ReportRollup
+    pk = rows.values_list('pk', flat=True).first()
+    if pk is not None:
+        ReportRollup.objects.filter(pk=pk).update(count=F('count') + delta)
+    elif delta > 0:
+        # A missing row on decrement means the cascade from a deleted business
+        # or investible already removed it
+        ReportRollup.objects.create(day=day, business_id=business_id, investible_id=investible_id, count=delta)
+
+
+def rebuild_report_rollups(batch_size=2000):
+    """
+    Recounts every rollup row from the Report table; returns the number of rows written.
+    """
+    counts = Counter()
+    fields = ['report_id', 'report_date', 'business_id', 'investible_id']
+    for _, report_date, business_id, investible_id in iter_keyset_batches(
+        Report.objects.all(), 'report_id', fields, batch_size
+    ):
+        counts[rollup_key(report_date, business_id, investible_id)] += 1
+    with transaction.atomic():
+        ReportRollup.objects.all().delete()
+        ReportRollup.objects.bulk_create(
+            (
+                ReportRollup(day=day, business_id=business_id, investible_id=investible_id, count=count)
+                for (day, business_id, investible_id), count in counts.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(counts)
+
+
+def report_series(bucket, start=None, end=None, business=None, investible=None):
+    """
+    Returns report counts per ``bucket`` between the ``start`` and ``end`` dates
+    (inclusive), with a per-industry breakdown, read from the rollup table.
+    """
+    rows = ReportRollup.objects.all()
+    if start is not None:
+        rows = rows.filter(day__gte=start)
+    if end is not None:
+        rows = rows.filter(day__lte=end)
+    if business is not None:
+        rows = rows.filter(business_id=business)
+    if investible is not None:
+        rows = rows.filter(investible_id=investible)
+    trunc = BUCKETS[bucket]
+    rows = rows.annotate(period=trunc('day') if trunc else F('day'))
+    grouped = rows.values_list('period', 'business__industry').annotate(total=Sum('count')).order_by('period')
+
+    series = {}
+    for period, industry, total in grouped:
+        if not total:
+            continue
+        entry = series.setdefault(period, {'period': period.isoformat(), 'total': 0, 'by_industry': {}})
+        entry['total'] += total
+        if industry is not None:
+            entry['by_industry'][industry] = entry['by_industry'].get(industry, 0) + total
+    return {
+        'bucket': bucket,
+        'from': start.isoformat() if start else None,
+        'to': end.isoformat() if end else None,
+        'series': list(series.values()),
+    }
@@ -0,0 +1,57 @@
+import threading
+from functools import wraps
+
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from .conditional import get_validators
+
+# Alias in settings.CACHES; point it at LocMemCache, FileBasedCache or RedisCache.
+RESPONSE_CACHE_ALIAS = 'responses'
+
+_counter_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0}
+
+
+def _count(name):
+    with _counter_lock:
+        _counters[name] += 1
+
+
+def response_cache_stats():
+    """
+    Returns this process's hit/miss counts for the response cache.
+    """
+    with _counter_lock:
+        hits, misses = _counters['hits'], _counters['misses']
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_rate': hits / total if total else 0.0}
+
+
+def cached_on(*models):
+    """
+    Caches the serialized data of successful GET responses. Keys embed the
+    version stamps of ``models`` (see conditional.py), so a post_save/post_delete
+    on any of them retires exactly the entries that depended on it; retired
+    entries simply age out of the backend.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def inner(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+            cache = caches[RESPONSE_CACHE_ALIAS]
+            etag, _ = get_validators(models, request)
+            # Paginated payloads embed absolute links, so the host is part of the key
+            key = f'response:{etag}:{request.get_host()}'
+            data = cache.get(key)
+            if data is not None:
+                _count('hits')
+                return Response(data)
+            _count('misses')
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200 and hasattr(response, 'data'):
+                cache.set(key, response.data)
+            return response
+        return inner
+    return decorator
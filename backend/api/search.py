@@ -0,0 +1,159 @@
+import re
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Business, Investible, Marker, SearchDocument, SearchTrigram
+
+# Text fields indexed for each searchable model
+SEARCH_FIELDS = {
+    Business: ('bsns_name', 'bsns_address'),
+    Investible: ('invst_description', 'invst_location', 'landmark', 'preferred_business', 'area'),
+}
+
+# Trigram rows per INSERT statement when indexing
+TRIGRAM_BATCH_SIZE = 2000
+
+# Documents sharing the most trigrams with the query are re-ranked in Python
+CANDIDATE_LIMIT = 200
+
+# Minimum share of the query's trigrams a document must contain to match
+MIN_WORD_SIMILARITY = 0.3
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def extract_trigrams(text):
+    """
+    Returns the set of trigrams of ``text``, padding each word the way pg_trgm
+    does so short words and word boundaries still produce trigrams.
+    """
+    trigrams = set()
+    for word in _WORD_RE.findall((text or '').lower()):
+        padded = f'  {word} '
+        trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return trigrams
+
+
+def document_text(instance):
+    return ' '.join(str(getattr(instance, field) or '') for field in SEARCH_FIELDS[type(instance)])
+
+
+def index_instances(instances):
+    """
+    (Re)indexes saved Business/Investible instances. Their documents are
+    replaced (trigrams go with them) and rewritten with one bulk insert per
+    table, whatever the number of instances.
+    """
+    if not instances:
+        return
+    trigrams = {
+        (instance._meta.model_name, instance.pk): extract_trigrams(document_text(instance))
+        for instance in instances
+    }
+    object_ids = {}
+    for model, object_id in trigrams:
+        object_ids.setdefault(model, []).append(object_id)
+    with transaction.atomic():
+        for model, ids in object_ids.items():
+            SearchDocument.objects.filter(model=model, object_id__in=ids).delete()
+        SearchDocument.objects.bulk_create(
+            SearchDocument(model=model, object_id=object_id, trigram_count=len(document_trigrams))
+            for (model, object_id), document_trigrams in trigrams.items()
+        )
+        # Read back by (model, object_id): MySQL cannot return ids from a bulk insert
+        documents = {}
+        for model, ids in object_ids.items():
+            rows = SearchDocument.objects.filter(model=model, object_id__in=ids).values_list('object_id', 'pk')
+            documents.update(((model, object_id), pk) for object_id, pk in rows)
+        SearchTrigram.objects.bulk_create(
+            (
+                SearchTrigram(document_id=documents[key], trigram=trigram)
+                for key, document_trigrams in trigrams.items()
+                for trigram in document_trigrams
+            ),
+            batch_size=TRIGRAM_BATCH_SIZE,
+        )
+
+
+def remove_instance(instance):
+    SearchDocument.objects.filter(model=instance._meta.model_name, object_id=instance.pk).delete()
+
+
+def rebuild_index(batch_size=1000):
+    """
+    Drops and rebuilds the whole index; returns the number of documents indexed.
+    """
+    SearchDocument.objects.all().delete()
+    indexed = 0
+    for model in SEARCH_FIELDS:
+        batch = []
+        for instance in model.objects.iterator(chunk_size=batch_size):
+            batch.append(instance)
+            if len(batch) >= batch_size:
+                index_instances(batch)
+                indexed += len(batch)
+                batch = []
+        index_instances(batch)
+        indexed += len(batch)
+    return indexed
+
+
+def search(query, limit=20):
+    """
+    Returns ranked, typo-tolerant matches for ``query`` across businesses and
+    investibles, each with the coordinates of its markers.
+    """
+    query_trigrams = extract_trigrams(query)
+    if not query_trigrams:
+        return []
+
+    candidates = (
+        SearchTrigram.objects.filter(trigram__in=query_trigrams)
+        .values('document')
+        .annotate(shared=Count('id'))
+        .order_by('-shared')[:CANDIDATE_LIMIT]
+    )
+    shared = {row['document']: row['shared'] for row in candidates}
+    documents = SearchDocument.objects.filter(pk__in=shared)
+
+    scored = []
+    for document in documents:
+        common = shared[document.pk]
+        # Share of the query found in the document, then overall trigram similarity
+        word_similarity = common / len(query_trigrams)
+        similarity = common / (len(query_trigrams) + document.trigram_count - common)
+        if word_similarity >= MIN_WORD_SIMILARITY:
+            scored.append((word_similarity, similarity, document))
+    scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+    scored = scored[:limit]
+
+    ids = {'business': [], 'investible': []}
+    for _, _, document in scored:
+        ids[document.model].append(document.object_id)
+    objects = {
+        'business': Business.objects.in_bulk(ids['business']),
+        'investible': Investible.objects.in_bulk(ids['investible']),
+    }
+    markers = {}
+    marker_rows = Marker.objects.filter(
+        Q(business_id__in=ids['business']) | Q(invst_id__in=ids['investible'])
+    ).values_list('marker_id', 'latitude', 'longitude', 'business_id', 'invst_id')
+    for marker_id, latitude, longitude, business_id, investible_id in marker_rows:
+        key = ('business', business_id) if business_id is not None else ('investible', investible_id)
+        markers.setdefault(key, []).append({'marker_id': marker_id, 'latitude': latitude, 'longitude': longitude})
+
+    results = []
+    for word_similarity, similarity, document in scored:
+        instance = objects[document.model].get(document.object_id)
+        if instance is None:
+            continue
+        results.append({
+            'type': document.model,
+            'id': document.object_id,
+            'title': instance.bsns_name if document.model == 'business' else instance.invst_description,
+            'text': document_text(instance),
+            'score': round((word_similarity + similarity) / 2, 4),
+            'markers': markers.get((document.model, document.object_id), []),
+        })
+    return results
@@ -1,6 +1,12 @@
 from rest_framework import serializers
-from .models import User, Business, Investible, Report, Marker
+from .models import User, Business, Investible, Report, Marker, InvestibleCatchment
 from django.contrib.auth.hashers import make_password
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Max
+from .conditional import lock_versions
+from .signals import bulk_written
+from .boundary import in_city, zone_for
+from .geohash import encode
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -37,9 +43,19 @@ class InvestibleSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['investible_id']  # Same as BusinessSerializer
 
+class InvestibleCatchmentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InvestibleCatchment
+        fields = ['investible_id', 'counts', 'preferred_industry', 'score', 'computed_at']
+
+def validate_in_city(latitude, longitude):
+    if not in_city(latitude, longitude):
+        raise serializers.ValidationError({'latitude': 'The marker must be inside the city boundary.'})
+
 class MarkerSerializer(serializers.ModelSerializer):
     business = BusinessSerializer(read_only=True)
-    investible = InvestibleSerializer(read_only=True)
+    investible = InvestibleSerializer(source='invst', read_only=True)
+    zone = serializers.PrimaryKeyRelatedField(read_only=True)
     
     business_id = serializers.PrimaryKeyRelatedField(
         queryset=Business.objects.all(),
@@ -60,18 +76,109 @@ class MarkerSerializer(serializers.ModelSerializer):
         fields = [
             'marker_id', 'label', 'latitude', 'longitude', 
             'business', 'business_id', 
-            'investible', 'investible_id'
+            'investible', 'investible_id', 'zone', 'geohash'
         ]
+        read_only_fields = ['geohash']
+
+    def validate(self, attrs):
+        if 'latitude' in attrs or 'longitude' in attrs:
+            validate_in_city(
+                attrs.get('latitude', getattr(self.instance, 'latitude', None)),
+                attrs.get('longitude', getattr(self.instance, 'longitude', None)),
+            )
+        return attrs
+
+class MarkerPlacementListSerializer(serializers.ListSerializer):
+    def create(self, validated_data):
+        return place_markers(validated_data)
+
+
+class MarkerPlacementSerializer(serializers.Serializer):
+    """
+    Creates a marker together with the business or investible it pins, so the
+    map can place a pin in one request. Accepts a single object or an array.
+    """
+    label = serializers.CharField(max_length=100, required=False)
+    latitude = serializers.FloatField()
+    longitude = serializers.FloatField()
+    business = BusinessSerializer(required=False)
+    investible = InvestibleSerializer(required=False)
+
+    class Meta:
+        list_serializer_class = MarkerPlacementListSerializer
+
+    def validate(self, attrs):
+        if ('business' in attrs) == ('investible' in attrs):
+            raise serializers.ValidationError('Provide exactly one of business or investible.')
+        validate_in_city(attrs['latitude'], attrs['longitude'])
+        if not attrs.get('label'):
+            attrs['label'] = attrs['business']['bsns_name'][:100] if 'business' in attrs else 'Investible'
+        return attrs
+
+    def create(self, validated_data):
+        return place_markers([validated_data])[0]
 
-    # ✅ ADD THIS METHOD to ensure proper data serialization
     def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        
-        # If it's an investible marker, make sure investible data is included
-        if instance.invst and not representation.get('investible'):
-            representation['investible'] = InvestibleSerializer(instance.invst).data
-            
-        return representation
+        return MarkerSerializer(instance).data
+
+
+def _bulk_insert(model, objs):
+    """
+    bulk_create that sets the new primary keys on every backend. MySQL cannot
+    return them from a multi-row INSERT, so there the caller holds the model's
+    version lock (lock_versions) and the ids are read back as the rows above
+    the pre-insert maximum: no other writer can commit rows in between, and
+    this transaction's own rows come back in insertion order.
+    """
+    if not objs or connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs)
+    pk_name = model._meta.pk.attname
+    watermark = model.objects.aggregate(top=Max(pk_name))['top'] or 0
+    model.objects.bulk_create(objs)
+    ids = list(model.objects.filter(pk__gt=watermark).order_by('pk').values_list('pk', flat=True))
+    if len(ids) != len(objs):
+        raise DatabaseError(f'Expected {len(objs)} new {model._meta.model_name} rows, found {len(ids)}.')
+    for obj, pk in zip(objs, ids):
+        obj.pk = pk
+    return objs
+
+
+def place_markers(items):
+    """
+    Creates the businesses, investibles and markers described by validated
+    placement ``items`` in one transaction and returns the markers. Rows are
+    written with bulk_create, and the post_save bookkeeping runs through
+    bulk_written inside the same transaction, so it commits or rolls back
+    with them.
+    """
+    with transaction.atomic():
+        if not connection.features.can_return_rows_from_bulk_insert:
+            lock_versions(Business, Investible, Marker)
+        businesses = [Business(**item['business']) for item in items if 'business' in item]
+        investibles = [Investible(**item['investible']) for item in items if 'investible' in item]
+        _bulk_insert(Business, businesses)
+        _bulk_insert(Investible, investibles)
+
+        owners = iter(businesses), iter(investibles)
+        markers = [
+            Marker(
+                label=item['label'],
+                latitude=item['latitude'],
+                longitude=item['longitude'],
+                # bulk_create skips the pre_save handler that assigns these
+                zone_id=zone_for(item['latitude'], item['longitude']),
+                geohash=encode(item['latitude'], item['longitude']),
+                business=next(owners[0]) if 'business' in item else None,
+                invst=next(owners[1]) if 'investible' in item else None,
+            )
+            for item in items
+        ]
+        _bulk_insert(Marker, markers)
+
+        # bulk_create sends no post_save signals, so run their bookkeeping here
+        bulk_written(businesses + investibles + markers)
+    return markers
+
 
 class ReportSerializer(serializers.ModelSerializer):
     investible = InvestibleSerializer(read_only=True)
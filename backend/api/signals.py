@@ -0,0 +1,364 @@
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .catchment import compute_catchments, investibles_near, refresh_catchments_near
+from .clustering import apply_cluster_write
+from .conditional import bump_version, current_versions
+from .dashboard import adjust_summary, business_changes, instance_changes, investible_changes
+from .events import publish_marker_delete, publish_marker_upsert, publish_resync
+from .geohash import encode
+from .heatmap import MARKER_STATE_FIELDS, apply_deltas, marker_state, rebuild_heatmap, state_deltas
+from .models import Business, Investible, Marker, Report, Tombstone, User
+from .report_rollups import adjust_rollup, rollup_key
+from .search import index_instances, remove_instance
+from .spatial import apply_spatial_write
+from .boundary import zone_for
+from .vector_tiles import clear_tile_cache, invalidate_markers
+
+
+@receiver([post_save, post_delete], sender=Marker)
+@receiver([post_save, post_delete], sender=Business)
+@receiver([post_save, post_delete], sender=Investible)
+@receiver([post_save, post_delete], sender=Report)
+def bump_model_version(sender, **kwargs):
+    bump_version(sender)
+
+
+@receiver(post_delete, sender=Marker)
+@receiver(post_delete, sender=Business)
+@receiver(post_delete, sender=Investible)
+def write_tombstone(sender, instance, **kwargs):
+    Tombstone.objects.create(model=sender._meta.model_name, object_id=instance.pk)
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_save, sender=Investible)
+def update_search_index(sender, instance, **kwargs):
+    index_instances([instance])
+
+
+@receiver(post_delete, sender=Business)
+@receiver(post_delete, sender=Investible)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_instance(instance)
+
+
+@receiver(pre_save, sender=Marker)
+def assign_location_fields(sender, instance, **kwargs):
+    instance.zone_id = zone_for(instance.latitude, instance.longitude)
+    instance.geohash = encode(instance.latitude, instance.longitude)
+
+
+@receiver(pre_save, sender=Marker)
+@receiver(pre_delete, sender=Marker)
+def remember_marker_state(sender, instance, **kwargs):
+    # The heatmap counters and the catchments around the marker's old state
+    # change too; a deleted marker's business is still readable here
+    instance._previous_state = None if instance._state.adding else marker_state(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Marker)
+def marker_catchments_changed(sender, instance, **kwargs):
+    previous = getattr(instance, '_previous_state', None)
+    points = []
+    if instance.business_id is not None:
+        points.append((instance.latitude, instance.longitude))
+    if previous and previous[2] is not None and previous[:2] not in points:
+        points.append(previous[:2])
+    if points:
+        refresh_catchments_near(points)
+    elif instance.invst_id is not None:
+        compute_catchments([instance.invst_id])
+
+
+@receiver(post_save, sender=Marker)
+def marker_density_saved(sender, instance, **kwargs):
+    apply_deltas(state_deltas([getattr(instance, '_previous_state', None)], [marker_state(instance.pk)]))
+
+
+@receiver(post_delete, sender=Marker)
+def marker_density_deleted(sender, instance, **kwargs):
+    apply_deltas(state_deltas([getattr(instance, '_previous_state', None)]))
+
+
+def _marker_row(marker):
+    industry = marker.business.industry if marker.business_id is not None else None
+    return marker.pk, marker.latitude, marker.longitude, industry
+
+
+def markers_indexed(version, upserts=(), removals=()):
+    apply_cluster_write(Marker, version, upserts, removals)
+    apply_spatial_write(version, [row[:3] for row in upserts], removals)
+
+
+@receiver(post_save, sender=Marker)
+def marker_indexes_saved(sender, instance, **kwargs):
+    # The in-memory indexes follow the write once it commits, tagged with the
+    # Marker version it produced so they can tell whether they missed any
+    version, = current_versions(Marker)
+    row = _marker_row(instance)
+    transaction.on_commit(lambda: markers_indexed(version, upserts=[row]))
+
+
+@receiver(post_delete, sender=Marker)
+def marker_indexes_deleted(sender, instance, **kwargs):
+    version, = current_versions(Marker)
+    marker_id = instance.pk
+    transaction.on_commit(lambda: markers_indexed(version, removals=[marker_id]))
+
+
+def publish_markers(marker_ids):
+    """
+    Publishes an upsert event with the committed state of each marker.
+    """
+    # serializers.py imports this module, so the serializer is imported here
+    from .serializers import MarkerSerializer
+    markers = Marker.objects.select_related('business', 'invst').filter(pk__in=marker_ids).order_by('marker_id')
+    for data in MarkerSerializer(markers, many=True).data:
+        publish_marker_upsert(data)
+
+
+@receiver(post_save, sender=Marker)
+def marker_published(sender, instance, **kwargs):
+    marker_id = instance.pk
+    transaction.on_commit(lambda: publish_markers([marker_id]))
+
+
+@receiver(post_delete, sender=Marker)
+def marker_delete_published(sender, instance, **kwargs):
+    # Cascades from business/investible deletes arrive here too
+    marker_id = instance.pk
+    transaction.on_commit(lambda: publish_marker_delete(marker_id))
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_save, sender=Investible)
+def owner_published(sender, instance, created, **kwargs):
+    # Marker events nest the business/investible, so its markers are republished
+    if created:
+        return
+    markers = instance.business_markers if sender is Business else instance.investment_markers
+    marker_ids = list(markers.values_list('marker_id', flat=True))
+    if marker_ids:
+        transaction.on_commit(lambda: publish_markers(marker_ids))
+
+
+@receiver([post_save, post_delete], sender=Marker)
+def marker_tiles_changed(sender, instance, **kwargs):
+    # The tiles at the old and new position are dropped once the write commits
+    points = {(instance.latitude, instance.longitude)}
+    previous = getattr(instance, '_previous_state', None)
+    if previous:
+        points.add(previous[:2])
+    transaction.on_commit(lambda: invalidate_markers(points))
+
+
+@receiver(pre_save, sender=Business)
+@receiver(pre_save, sender=Investible)
+def remember_category(sender, instance, **kwargs):
+    # Industry and status changes move heatmap counters and dashboard totals
+    fields = ('industry', 'status') if sender is Business else ('status',)
+    instance._previous_category = (
+        None if instance._state.adding
+        else sender.objects.filter(pk=instance.pk).values_list(*fields).first()
+    )
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_save, sender=Investible)
+def category_density_changed(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_category', None)
+    if created or previous is None:
+        return
+    if sender is Business:
+        current = (instance.industry, instance.status)
+        markers = instance.business_markers.values_list('latitude', 'longitude')
+
+        def state(point, category):
+            return (*point, instance.pk, *category, None)
+    else:
+        current = (instance.status,)
+        markers = instance.investment_markers.filter(business__isnull=True).values_list('latitude', 'longitude')
+
+        def state(point, category):
+            return (*point, None, None, None, *category)
+    if current != previous:
+        points = list(markers)
+        apply_deltas(state_deltas(
+            [state(point, previous) for point in points],
+            [state(point, current) for point in points],
+        ))
+
+
+@receiver(post_save, sender=Business)
+def business_indexes_saved(sender, instance, **kwargs):
+    # An industry change moves the business's markers to another cluster breakdown key
+    version, = current_versions(Business)
+    previous = getattr(instance, '_previous_category', None)
+    rows = []
+    if previous is not None and previous[0] != instance.industry:
+        rows = [
+            (marker_id, latitude, longitude, instance.industry)
+            for marker_id, latitude, longitude in instance.business_markers.values_list(
+                'marker_id', 'latitude', 'longitude'
+            )
+        ]
+    transaction.on_commit(lambda: apply_cluster_write(Business, version, upserts=rows))
+
+
+@receiver(post_delete, sender=Business)
+def business_indexes_deleted(sender, instance, **kwargs):
+    # The cascade has already deleted (and unindexed) its markers
+    version, = current_versions(Business)
+    transaction.on_commit(lambda: apply_cluster_write(Business, version))
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_save, sender=Investible)
+def category_tiles_changed(sender, instance, created, **kwargs):
+    # Tiles carry business industry/status and investible status
+    previous = getattr(instance, '_previous_category', None)
+    current = (instance.industry, instance.status) if sender is Business else (instance.status,)
+    if created or previous is None or previous == current:
+        return
+    markers = instance.business_markers if sender is Business else instance.investment_markers
+    points = list(markers.values_list('latitude', 'longitude'))
+    transaction.on_commit(lambda: invalidate_markers(points))
+
+
+@receiver(post_save, sender=Business)
+def business_catchments_changed(sender, instance, created, **kwargs):
+    # Industry and status feed the counts; a new business has no markers yet
+    if not created:
+        refresh_catchments_near(instance.business_markers.values_list('latitude', 'longitude'))
+
+
+@receiver(post_save, sender=Investible)
+def investible_catchment_changed(sender, instance, created, **kwargs):
+    # preferred_business feeds the score
+    if not created:
+        compute_catchments([instance.pk])
+
+
+@receiver(pre_save, sender=Report)
+def remember_report_key(sender, instance, **kwargs):
+    instance._previous_rollup_key = None
+    if not instance._state.adding:
+        previous = Report.objects.filter(pk=instance.pk).values_list(
+            'report_date', 'business_id', 'investible_id'
+        ).first()
+        instance._previous_rollup_key = rollup_key(*previous) if previous else None
+
+
+@receiver(post_save, sender=Report)
+def report_rollup_saved(sender, instance, **kwargs):
+    key = rollup_key(instance.report_date, instance.business_id, instance.investible_id)
+    previous = getattr(instance, '_previous_rollup_key', None)
+    if key != previous:
+        if previous:
+            adjust_rollup(previous, -1)
+        adjust_rollup(key, 1)
+
+
+@receiver(post_delete, sender=Report)
+def report_rollup_deleted(sender, instance, **kwargs):
+    adjust_rollup(rollup_key(instance.report_date, instance.business_id, instance.investible_id), -1)
+
+
+@receiver(post_save, sender=Business)
+@receiver(post_save, sender=Investible)
+@receiver(post_save, sender=Marker)
+@receiver(post_save, sender=Report)
+@receiver(post_save, sender=User)
+def summary_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_summary(instance_changes([instance]))
+        return
+    # Only a business's industry/status or an investible's status moves a total
+    previous = getattr(instance, '_previous_category', None)
+    if previous is None:
+        return
+    if sender is Business:
+        changes = Counter(business_changes(*previous, -1))
+        changes.update(business_changes(instance.industry, instance.status, 1))
+    elif sender is Investible:
+        changes = Counter(investible_changes(*previous, -1))
+        changes.update(investible_changes(instance.status, 1))
+    else:
+        return
+    adjust_summary(changes)
+
+
+@receiver(post_delete, sender=Business)
+@receiver(post_delete, sender=Investible)
+@receiver(post_delete, sender=Marker)
+@receiver(post_delete, sender=Report)
+@receiver(post_delete, sender=User)
+def summary_deleted(sender, instance, **kwargs):
+    adjust_summary(instance_changes([instance], sign=-1))
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    user_cache.invalidate_user(str(instance.pk))
+
+
+_bulk_import = threading.local()
+
+
+@contextmanager
+def bulk_import():
+    """
+    Defers the catchment, heatmap, tile and marker event upkeep of
+    bulk_written in this thread, whose cost grows with the table rather than
+    the batch. On exit the catchments and heatmap counters are rebuilt once,
+    the tile cache is cleared and event subscribers are told to resync; this
+    also runs after a failure, as earlier batches have committed.
+    """
+    _bulk_import.active = True
+    try:
+        yield
+    finally:
+        _bulk_import.active = False
+        compute_catchments()
+        rebuild_heatmap()
+        clear_tile_cache()
+        publish_resync()
+
+
+def bulk_written(instances):
+    """
+    Runs the post_save bookkeeping above for rows written with bulk_create,
+    which does not send model signals.
+    """
+    models = {type(instance) for instance in instances}
+    for model in models:
+        bump_version(model)
+    index_instances([instance for instance in instances if type(instance) in (Business, Investible)])
+    adjust_summary(instance_changes(instances))
+    if Business in models:
+        version, = current_versions(Business)
+        transaction.on_commit(lambda: apply_cluster_write(Business, version))
+    if Marker in models:
+        markers = [instance for instance in instances if type(instance) is Marker]
+        version, = current_versions(Marker)
+        rows = [_marker_row(marker) for marker in markers]
+        transaction.on_commit(lambda: markers_indexed(version, upserts=rows))
+        if getattr(_bulk_import, 'active', False):
+            return
+        points = {(marker.latitude, marker.longitude) for marker in markers}
+        transaction.on_commit(lambda: invalidate_markers(points))
+        marker_ids = [marker.pk for marker in markers]
+        transaction.on_commit(lambda: publish_markers(marker_ids))
+        states = Marker.objects.filter(pk__in=[m.pk for m in markers]).values_list(*MARKER_STATE_FIELDS)
+        apply_deltas(state_deltas(added=states))
+        compute_catchments(
+            investibles_near((m.latitude, m.longitude) for m in markers if m.business_id is not None)
+            | {m.invst_id for m in markers if m.invst_id is not None}
+        )
@@ -0,0 +1,234 @@
+import math
+import threading
+
+import numpy as np
+
+from .conditional import current_versions
+from .models import Marker
+
+EARTH_RADIUS_M = 6371008.8
+
+# Grid cell edge in degrees (about 550 m at the equator)
+CELL_DEGREES = 0.005
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in meters between two WGS84 points.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def haversine_many(lat1, lon1, lat2, lon2):
+    """
+    Vectorized ``haversine_m`` over NumPy-broadcastable coordinates, e.g. one
+    point against arrays of candidates, or an ``(n, 1)`` column of origins
+    against ``(m,)`` rows for an ``n x m`` distance matrix.
+    """
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = np.radians(np.subtract(lon2, lon1))
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def _cell(latitude, longitude):
+    return math.floor(latitude / CELL_DEGREES), math.floor(longitude / CELL_DEGREES)
+
+
+class MarkerGridIndex:
+    """
+    Uniform lat/lon grid over every Marker for radius and k-nearest queries.
+    Writes move a single point between cells; distances are exact haversine,
+    computed a whole cell at a time over NumPy arrays of its coordinates.
+    ``version`` is the Marker version stamp the contents reflect.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cells = {}
+        self._points = {}
+        # cell -> (ids, latitudes, longitudes) arrays, built on first read after a write
+        self._arrays = {}
+        self.version = None
+
+    def _add(self, marker_id, latitude, longitude):
+        cell = _cell(latitude, longitude)
+        self._cells.setdefault(cell, {})[marker_id] = (latitude, longitude)
+        self._points[marker_id] = cell
+        self._arrays.pop(cell, None)
+
+    def _remove(self, marker_id):
+        cell = self._points.pop(marker_id, None)
+        if cell is None:
+            return
+        members = self._cells[cell]
+        del members[marker_id]
+        if not members:
+            del self._cells[cell]
+        self._arrays.pop(cell, None)
+
+    def _cell_arrays(self, cell):
+        arrays = self._arrays.get(cell)
+        if arrays is None:
+            members = self._cells[cell]
+            coordinates = np.array(list(members.values()), dtype=float).reshape(-1, 2)
+            arrays = (np.fromiter(members, dtype=np.int64, count=len(members)), coordinates[:, 0], coordinates[:, 1])
+            self._arrays[cell] = arrays
+        return arrays
+
+    def _distances(self, latitude, longitude, cells):
+        """
+        Returns ``(ids, distances)`` arrays for every point in ``cells``.
+        """
+        if not cells:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        ids, lats, lons = zip(*(self._cell_arrays(cell) for cell in cells))
+        ids = np.concatenate(ids)
+        return ids, haversine_many(latitude, longitude, np.concatenate(lats), np.concatenate(lons))
+
+    @staticmethod
+    def _pairs(ids, distances, limit=None):
+        # Nearest first, ties broken by id
+        order = np.lexsort((ids, distances))[:limit]
+        return list(zip(distances[order].tolist(), ids[order].tolist()))
+
+    def load(self, rows, version=None):
+        """
+        Replaces the index contents with ``(marker_id, latitude, longitude)`` rows.
+        """
+        with self._lock:
+            self._cells = {}
+            self._points = {}
+            self._arrays = {}
+            for row in rows:
+                self._add(*row)
+            self.version = version
+
+    def apply(self, version, upserts=(), removals=()):
+        """
+        Applies a committed marker write that moved the Marker version stamp to
+        ``version``; as in MarkerClusterIndex.apply, a write that does not
+        directly follow the reflected version is skipped and the index rebuilt
+        on the next read.
+        """
+        with self._lock:
+            if self.version is None or self.version != version - 1:
+                return
+            for marker_id in removals:
+                self._remove(marker_id)
+            for marker_id, latitude, longitude in upserts:
+                self._remove(marker_id)
+                self._add(marker_id, latitude, longitude)
+            self.version = version
+
+    def upsert(self, marker_id, latitude, longitude):
+        with self._lock:
+            self._remove(marker_id)
+            self._add(marker_id, latitude, longitude)
+
+    def remove(self, marker_id):
+        with self._lock:
+            self._remove(marker_id)
+
+    def _within(self, latitude, longitude, radius_m):
+        # Exact spherical bounding box of the circle, so no match is cut off
+        angular = radius_m / EARTH_RADIUS_M
+        lat_span = math.degrees(angular)
+        cos_lat = math.cos(math.radians(latitude))
+        ratio = math.sin(angular) / cos_lat if cos_lat > 1e-12 else 2.0
+        lon_span = math.degrees(math.asin(ratio)) if ratio < 1 else 180.0
+        min_row, min_col = _cell(latitude - lat_span, longitude - lon_span)
+        max_row, max_col = _cell(latitude + lat_span, longitude + lon_span)
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+            cells = [
+                (row, col) for row, col in self._cells
+                if min_row <= row <= max_row and min_col <= col <= max_col
+            ]
+        else:
+            cells = [
+                (row, col)
+                for row in range(min_row, max_row + 1)
+                for col in range(min_col, max_col + 1)
+                if (row, col) in self._cells
+            ]
+        ids, distances = self._distances(latitude, longitude, cells)
+        inside = distances <= radius_m
+        return self._pairs(ids[inside], distances[inside])
+
+    def within(self, latitude, longitude, radius_m):
+        """
+        Returns ``(distance_m, marker_id)`` pairs within ``radius_m``, nearest first.
+        """
+        with self._lock:
+            return self._within(latitude, longitude, radius_m)
+
+    def nearest(self, latitude, longitude, k):
+        """
+        Returns the ``k`` nearest ``(distance_m, marker_id)`` pairs, nearest first.
+        """
+        with self._lock:
+            if not self._points:
+                return []
+            row, col = _cell(latitude, longitude)
+            seen = 0
+            ring = 0
+            bound = None
+            # Grow square rings of cells until k candidates are seen, falling
+            # back to a full scan once the square outgrows the occupied cells.
+            while seen < k and (2 * ring + 1) ** 2 <= len(self._cells) * 4:
+                cells = [
+                    (r, c)
+                    for r in range(row - ring, row + ring + 1)
+                    for c in range(col - ring, col + ring + 1)
+                    if max(abs(r - row), abs(c - col)) == ring and (r, c) in self._cells
+                ]
+                if cells:
+                    _, distances = self._distances(latitude, longitude, cells)
+                    bound = distances if bound is None else np.concatenate((bound, distances))
+                    seen = len(bound)
+                ring += 1
+            if seen >= k:
+                # The k-th candidate distance bounds the answer; one exact radius query settles it
+                return self._within(latitude, longitude, float(np.partition(bound, k - 1)[k - 1]))[:k]
+            ids, distances = self._distances(latitude, longitude, list(self._cells))
+            return self._pairs(ids, distances, k)
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_spatial_index():
+    """
+    Returns the process-wide marker grid, rebuilding it from the Marker table
+    on first use and whenever it is behind the Marker version stamp.
+    """
+    global _index
+    version, = current_versions(Marker)
+    if _index is None or _index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                index = MarkerGridIndex()
+                index.load(Marker.objects.values_list('marker_id', 'latitude', 'longitude').iterator(), version)
+                _index = index
+    return _index
+
+
+def reset_spatial_index():
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def apply_spatial_write(version, upserts=(), removals=()):
+    """
+    Applies a committed write to the grid if it has been built; ``upserts``
+    are ``(marker_id, latitude, longitude)`` rows. Called from the on_commit
+    hooks in signals.py.
+    """
+    if _index is not None:
+        _index.apply(version, upserts, removals)
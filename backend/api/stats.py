@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.db.models import Count
+
+from .conditional import current_versions
+from .models import Business, Investible, Marker, Zone
+
+# Keys embed the version stamps of the counted models (conditional.py), so a
+# write in any worker process retires them; the timeout ages out retired entries.
+STATS_CACHE_TIMEOUT = 300
+
+BUSINESS_STATS_KEY = 'stats:businesses'
+INVESTIBLE_STATS_KEY = 'stats:investibles'
+ZONE_STATS_KEY = 'stats:zones'
+
+
+def _grouped_counts(model, field):
+    """
+    Counts rows grouped by ``(field, status)`` with a single GROUP BY query and
+    rolls the result up into per-status and per-``field`` totals.
+    """
+    statuses = [value for value, _ in model._meta.get_field('status').choices]
+    total = 0
+    by_status = dict.fromkeys(statuses, 0)
+    by_field = {}
+    by_field_status = {}
+    rows = model.objects.values_list(field, 'status').annotate(count=Count('pk')).order_by()
+    for value, row_status, count in rows:
+        total += count
+        by_status[row_status] = by_status.get(row_status, 0) + count
+        by_field[value] = by_field.get(value, 0) + count
+        breakdown = by_field_status.setdefault(value, dict.fromkeys(statuses, 0))
+        breakdown[row_status] = breakdown.get(row_status, 0) + count
+    return {
+        'total': total,
+        'by_status': by_status,
+        f'by_{field}': by_field,
+        f'by_{field}_status': by_field_status,
+    }
+
+
+def _cached(key, models, compute):
+    """
+    Returns ``compute()`` cached under ``key`` and the current versions of ``models``.
+    """
+    versions = '.'.join(str(version) for version in current_versions(*models))
+    return cache.get_or_set(f'{key}:{versions}', compute, STATS_CACHE_TIMEOUT)
+
+
+def business_stats():
+    return _cached(BUSINESS_STATS_KEY, (Business,), lambda: _grouped_counts(Business, 'industry'))
+
+
+def investible_stats():
+    return _cached(INVESTIBLE_STATS_KEY, (Investible,), lambda: _grouped_counts(Investible, 'area'))
+
+
+def _zone_counts():
+    """
+    Counts markers per zone, split by industry for business markers, with one
+    GROUP BY over the indexed Marker.zone column.
+    """
+    zones = {
+        zone_id: {'zone_id': zone_id, 'name': name, 'markers': 0, 'investibles': 0, 'by_industry': {}}
+        for zone_id, name in Zone.objects.values_list('zone_id', 'name')
+    }
+    # Markers outside every zone are reported under a null zone
+    zones[None] = {'zone_id': None, 'name': None, 'markers': 0, 'investibles': 0, 'by_industry': {}}
+    rows = (
+        Marker.objects.values_list('zone_id', 'business__industry')
+        .annotate(markers=Count('pk'), investibles=Count('invst'))
+        .order_by()
+    )
+    for zone_id, industry, markers, investibles in rows:
+        entry = zones[zone_id]
+        entry['markers'] += markers
+        entry['investibles'] += investibles
+        if industry is not None:
+            entry['by_industry'][industry] = entry['by_industry'].get(industry, 0) + markers
+    return list(zones.values())
+
+
+def zone_stats():
+    # Zone is versioned by `manage.py load_zones`
+    return _cached(ZONE_STATS_KEY, (Marker, Business, Zone), _zone_counts)
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+from .models import Business, Investible, Marker, Tombstone
+from .serializers import BusinessSerializer, InvestibleSerializer, MarkerSerializer
+
+# Each token is taken this far before the query started, so rows committed by
+# transactions still open at query time are sent again rather than missed.
+# Clients apply upserts idempotently.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+def encode_token(moment):
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_token(token):
+    """
+    Returns the aware datetime a sync token stands for; raises ValueError if malformed.
+    """
+    return datetime.fromtimestamp(int(token) / 1_000_000, tz=dt_timezone.utc)
+
+
+def changes_since(since=None):
+    """
+    Returns the markers, businesses and investibles changed after ``since``
+    plus the ids deleted since then, or a full snapshot when ``since`` is None.
+    """
+    token = encode_token(timezone.now() - SYNC_OVERLAP)
+    markers = Marker.objects.select_related('business', 'invst')
+    businesses = Business.objects.all()
+    investibles = Investible.objects.all()
+    deleted = {model: [] for model, _ in Tombstone.MODEL_CHOICES}
+    if since is not None:
+        markers = markers.filter(updated_at__gt=since)
+        businesses = businesses.filter(updated_at__gt=since)
+        investibles = investibles.filter(updated_at__gt=since)
+        for model, object_id in Tombstone.objects.filter(deleted_at__gt=since).values_list('model', 'object_id'):
+            deleted[model].append(object_id)
+    return {
+        'token': token,
+        'full': since is None,
+        'markers': MarkerSerializer(markers, many=True).data,
+        'businesses': BusinessSerializer(businesses, many=True).data,
+        'investibles': InvestibleSerializer(investibles, many=True).data,
+        'deleted': deleted,
+    }
@@ -1,3 +1,802 @@
-from django.test import TestCase
+import asyncio
+from collections import Counter
+import io
+import json
+import os
+import tempfile
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, Client, TestCase, TransactionTestCase, tag
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .boundary import get_boundary_bbox, in_city
+from .clustering import INDEX_MODELS, MarkerClusterIndex, get_cluster_index, reset_cluster_index
+from .conditional import bump_version, current_versions
+from .dashboard import check_summary, get_summary
+from .exports import iter_marker_geojson
+from .filters import QueryParamFilter
+from .geohash import encode
+from .heatmap import rebuild_heatmap
+from .models import Business, DensityCell, Investible, Marker, Report, ReportRollup, User
+from .report_rollups import rebuild_report_rollups
+from .response_cache import RESPONSE_CACHE_ALIAS, response_cache_stats
+from .serializers import MarkerPlacementSerializer, place_markers
+from .stats import business_stats, investible_stats, zone_stats
+from .signals import bulk_import
+from .views import BusinessViewSet, InvestibleViewSet
+
+INDUSTRIES = [value for value, _ in Business.INDUSTRY_CHOICES]
+
+
+def city_points(count, seed=0):
+    """
+    Returns ``count`` random ``(latitude, longitude)`` points inside the city boundary.
+    """
+    rng = random.Random(seed)
+    min_lon, min_lat, max_lon, max_lat = get_boundary_bbox()
+    points = []
+    while len(points) < count:
+        point = rng.uniform(min_lat, max_lat), rng.uniform(min_lon, max_lon)
+        if in_city(*point):
+            points.append(point)
+    return points
+
+
+def seed_markers(count, start=1, origin=(10.25, 123.85)):
+    """
+    Bulk-inserts ``count`` markers on a 0.1 degree grid north-east of ``origin``,
+    alternating business and investible markers, plus one report per marker.
+    Primary keys run from ``start`` and are set explicitly so the rows come back
+    on backends without RETURNING.
+    """
+    businesses, investibles, markers, reports = [], [], [], []
+    for pk in range(start, start + count):
+        latitude = origin[0] + (pk % 100) * 0.001
+        longitude = origin[1] + (pk // 100 % 100) * 0.001
+        if pk % 2:
+            businesses.append(Business(
+                business_id=pk, bsns_name=f'Business {pk}', bsns_address=f'{pk} Main St',
+                industry=INDUSTRIES[pk % len(INDUSTRIES)],
+            ))
+            owner = {'business_id': pk}
+        else:
+            investibles.append(Investible(
+                investible_id=pk, invst_location=f'Lot {pk}', invst_description='Vacant lot',
+                area=f'Area {pk % 10}',
+            ))
+            owner = {'invst_id': pk}
+        markers.append(Marker(
+            marker_id=pk, label=f'Marker {pk}', latitude=latitude, longitude=longitude,
+            geohash=encode(latitude, longitude), **owner,
+        ))
+        reports.append(Report(
+            report_id=pk, report_description=f'Report {pk}',
+            business_id=owner.get('business_id'), investible_id=owner.get('invst_id'),
+        ))
+    Business.objects.bulk_create(businesses, batch_size=1000)
+    Investible.objects.bulk_create(investibles, batch_size=1000)
+    Marker.objects.bulk_create(markers, batch_size=1000)
+    Report.objects.bulk_create(reports, batch_size=1000)
+
+
+class ReadQueryCountMixin:
+    """
+    Pins the query count of the hot read endpoints; run at two table sizes so a
+    per-row query (a missing select_related, a serializer lookup) fails both.
+    """
+
+    marker_count = None
+
+    # One version-stamp read for the conditional/cache decorators plus the joined select
+    LIST_QUERIES = 2
+    DETAIL_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_markers(cls.marker_count)
+        cls.user = User.objects.create_user('staff', 'staff@example.com', 'password')
+
+    def setUp(self):
+        caches[RESPONSE_CACHE_ALIAS].clear()
+        self.client = APIClient()
+
+    def test_marker_list(self):
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get('/api/markers/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), self.marker_count)
+
+    def test_marker_list_filtered(self):
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get('/api/markers/', {
+                'bbox': '123.85,10.25,123.95,10.35', 'status': 'active,available', 'ordering': '-created_at',
+            })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), self.marker_count)
+
+    def test_marker_detail(self):
+        with self.assertNumQueries(self.DETAIL_QUERIES):
+            response = self.client.get(f'/api/markers/{self.marker_count}/')
+        self.assertEqual(response.status_code, 200)
+
+    def test_report_list(self):
+        self.client.force_authenticate(self.user)
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get('/api/reports/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), self.marker_count)
+
+
+class ReadQueryCount1kTests(ReadQueryCountMixin, TestCase):
+    marker_count = 1000
+
+
+class ReadQueryCount10kTests(ReadQueryCountMixin, TestCase):
+    marker_count = 10000
+
+
+class IndexUsageTests(TestCase):
+    """
+    Checks the query plans of the list filters name their composite indexes,
+    so a reordered filter or a dropped index shows up as a failing test.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        # Enough rows that MySQL prefers the index over a table scan
+        seed_markers(400)
+
+    def filter_list(self, view, params):
+        request = Request(APIRequestFactory().get('/', params))
+        return QueryParamFilter().filter_queryset(request, view.queryset, view)
+
+    def assertUsesIndex(self, queryset, index):
+        if connection.vendor == 'sqlite':
+            self.assertIn(index, queryset.explain())
+        elif connection.vendor == 'mysql':
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                columns = [column[0] for column in cursor.description]
+                keys = [dict(zip(columns, row))['key'] for row in cursor.fetchall()]
+            self.assertIn(index, keys)
+        else:
+            self.skipTest(f'No plan check for {connection.vendor}')
+
+    def test_business_status_industry(self):
+        queryset = self.filter_list(BusinessViewSet, {'status': 'inactive', 'industry': 'mall'})
+        self.assertUsesIndex(queryset, 'business_status_industry_idx')
+
+    def test_business_status_only(self):
+        self.assertUsesIndex(self.filter_list(BusinessViewSet, {'status': 'inactive'}), 'business_status_industry_idx')
+
+    def test_investible_status_area(self):
+        queryset = self.filter_list(InvestibleViewSet, {'status': 'pending', 'area': 'Area 1'})
+        self.assertUsesIndex(queryset, 'investible_status_area_idx')
+
+    def test_report_date_range(self):
+        end = timezone.make_aware(datetime(2025, 1, 1))
+        self.assertUsesIndex(Report.objects.filter(report_date__range=(end - timedelta(days=30), end)), 'report_date_idx')
+
+
+def median_seconds(func, repeat=5):
+    func()  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+class BenchmarkMixin:
+
+    def report(self, summary):
+        # Printed on success too, so runs can be compared
+        sys.stderr.write(f'\n{type(self).__name__}: {summary}\n')
+
+
+@tag('benchmark')
+class BboxLatencyBenchmark(BenchmarkMixin, TestCase):
+    """
+    A fixed viewport over a growing table: only rows outside the viewport are
+    added, so with the lat/lon index (and geohash ranges) the request time
+    should stay roughly flat while a full scan would grow with the table.
+    Run alone with ``manage.py test api --tag benchmark``.
+    """
+
+    VIEWPORT = '123.85,10.25,123.95,10.35'
+    VIEWPORT_MARKERS = 500
+    TABLE_SIZES = (1000, 10000, 40000)
+
+    def request_viewport(self):
+        caches[RESPONSE_CACHE_ALIAS].clear()
+        response = self.client.get('/api/markers/', {'bbox': self.VIEWPORT})
+        self.assertEqual(len(response.data), self.VIEWPORT_MARKERS)
+
+    def test_latency_flat_as_table_grows(self):
+        self.client = APIClient()
+        seed_markers(self.VIEWPORT_MARKERS)
+        seeded, latencies = self.VIEWPORT_MARKERS, {}
+        for size in self.TABLE_SIZES:
+            # The rest of the table lies north of the viewport
+            seed_markers(size - seeded, start=seeded + 1, origin=(10.45, 123.85))
+            seeded = size
+            latencies[size] = median_seconds(self.request_viewport)
+        summary = ', '.join(f'{size} rows: {seconds * 1000:.1f} ms' for size, seconds in latencies.items())
+        self.report(summary)
+        self.assertLess(latencies[self.TABLE_SIZES[-1]], 2 * latencies[self.TABLE_SIZES[0]], summary)
+
+
+@tag('benchmark')
+class GeoJSONExportMemoryBenchmark(BenchmarkMixin, TestCase):
+    """
+    Peak Python allocation while draining the GeoJSON export should depend on
+    the chunk size, not the table size.
+    """
+
+    CHUNK_SIZE = 1000
+    TABLE_SIZES = (4000, 20000)
+
+    def peak_bytes(self):
+        tracemalloc.start()
+        try:
+            features = sum(1 for _ in iter_marker_geojson(chunk_size=self.CHUNK_SIZE)) - 2
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(features, Marker.objects.count())
+        return peak
+
+    def test_memory_flat_as_table_grows(self):
+        seeded, peaks = 0, {}
+        for size in self.TABLE_SIZES:
+            seed_markers(size - seeded, start=seeded + 1)
+            seeded = size
+            peaks[size] = self.peak_bytes()
+        summary = ', '.join(f'{size} rows: {peak / 1024:.0f} KiB' for size, peak in peaks.items())
+        self.report(summary)
+        self.assertLess(peaks[self.TABLE_SIZES[-1]], 1.5 * peaks[self.TABLE_SIZES[0]], summary)
+
+
+class ResponseCacheInvalidationTests(TestCase):
+    """
+    A write bumps its model's version stamp, retiring exactly the cached
+    responses keyed on that model.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_markers(20)
+        cls.user = User.objects.create_user('staff', 'staff@example.com', 'password')
+
+    def setUp(self):
+        caches[RESPONSE_CACHE_ALIAS].clear()
+        self.client = APIClient()
+
+    def fetch(self, *urls):
+        before = response_cache_stats()
+        for url in urls:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        after = response_cache_stats()
+        return after['hits'] - before['hits'], after['misses'] - before['misses']
+
+    def test_business_write_retires_dependent_entries(self):
+        dependent = ['/api/businesses/', '/api/businesses/1/', '/api/markers/', '/api/markers/2/']
+        independent = ['/api/investibles/', '/api/investibles/2/']
+        self.assertEqual(self.fetch(*dependent, *independent), (0, 6))
+        self.assertEqual(self.fetch(*dependent, *independent), (6, 0))
+
+        self.client.force_authenticate(self.user)
+        response = self.client.patch('/api/businesses/3/', {'status': 'inactive'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(None)
+
+        self.assertEqual(self.fetch(*independent), (2, 0))
+        self.assertEqual(self.fetch(*dependent), (0, 4))
+        self.assertEqual(self.fetch(*dependent), (4, 0))
+
+
+@tag('benchmark')
+class ResponseCacheThroughputBenchmark(BenchmarkMixin, TestCase):
+    """
+    Requests per second for the full marker list served from the response
+    cache against the same list rebuilt on every request.
+    """
+
+    MARKERS = 2000
+    REQUESTS = 20
+
+    def requests_per_second(self, cached):
+        started = time.perf_counter()
+        for _ in range(self.REQUESTS):
+            if not cached:
+                caches[RESPONSE_CACHE_ALIAS].clear()
+            response = self.client.get('/api/markers/')
+            self.assertEqual(len(response.data), self.MARKERS)
+        return self.REQUESTS / (time.perf_counter() - started)
+
+    def test_cached_throughput(self):
+        self.client = APIClient()
+        seed_markers(self.MARKERS)
+        uncached = self.requests_per_second(cached=False)
+        self.client.get('/api/markers/')
+        cached = self.requests_per_second(cached=True)
+        summary = f'uncached: {uncached:.1f} req/s, cached: {cached:.1f} req/s'
+        self.report(summary)
+        self.assertGreater(cached, 3 * uncached, summary)
+
+
+class AsyncMarkerListTests(TestCase):
+    """
+    The async marker list filters, orders and limits exactly like the DRF one.
+    """
+
+    QUERIES = [
+        {},
+        {'bbox': '123.85,10.25,123.9,10.3'},
+        {'bbox': '123.85,10.25,123.9,10.3', 'industry': 'mall,school', 'ordering': '-label'},
+        {'status': 'available', 'area': 'Area 2', 'limit': '5'},
+        {'ordering': 'created_at', 'limit': '7'},
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_markers(200)
+
+    async def test_matches_sync_list(self):
+        for params in self.QUERIES:
+            with self.subTest(**params):
+                await caches[RESPONSE_CACHE_ALIAS].aclear()
+                expected = await self.async_client.get('/api/markers/', params)
+                response = await self.async_client.get('/api/async/markers/', params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+
+    async def test_rejects_bad_bbox(self):
+        response = await self.async_client.get('/api/async/markers/', {'bbox': '1,2,3'})
+        self.assertEqual(response.status_code, 400)
+
+
+@tag('benchmark')
+class AsyncConcurrencyBenchmark(BenchmarkMixin, TransactionTestCase):
+    """
+    Throughput of the marker bbox list at 50-500 concurrent clients: the sync
+    view through the WSGI handler on one thread per client, against the async
+    view through the ASGI handler on one event loop.
+    """
+
+    CLIENTS = (50, 200, 500)
+
+    def viewport(self, client):
+        # A distinct bbox per client keeps the sync path's response cache cold
+        return {'bbox': f'123.85,10.25,123.9,{10.255 + client * 1e-7:.7f}'}
+
+    def setUp(self):
+        seed_markers(2000)
+
+    def sync_requests_per_second(self, clients):
+        def fetch(client):
+            return Client().get('/api/markers/', self.viewport(client)).status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            statuses = list(pool.map(fetch, range(clients)))
+        elapsed = time.perf_counter() - started
+        self.assertEqual(statuses, [200] * clients)
+        return clients / elapsed
+
+    def async_requests_per_second(self, clients):
+        async def fetch_all():
+            client = AsyncClient()
+            responses = await asyncio.gather(*(
+                client.get('/api/async/markers/', self.viewport(index)) for index in range(clients)
+            ))
+            return [response.status_code for response in responses]
+
+        started = time.perf_counter()
+        statuses = asyncio.run(fetch_all())
+        elapsed = time.perf_counter() - started
+        self.assertEqual(statuses, [200] * clients)
+        return clients / elapsed
+
+    def test_throughput_under_concurrency(self):
+        results = {}
+        for clients in self.CLIENTS:
+            caches[RESPONSE_CACHE_ALIAS].clear()
+            results[clients] = (self.sync_requests_per_second(clients), self.async_requests_per_second(clients))
+        summary = ', '.join(
+            f'{clients} clients: wsgi {sync:.0f} req/s, asgi {async_:.0f} req/s'
+            for clients, (sync, async_) in results.items()
+        )
+        self.report(summary)
+        for sync, async_ in results.values():
+            # The event loop should keep up with a thread per client at every level
+            self.assertGreater(async_, 0.5 * sync, summary)
+        # ...and hold its throughput as clients pile up
+        self.assertGreater(results[self.CLIENTS[-1]][1], 0.5 * results[self.CLIENTS[0]][1], summary)
+
+
+@tag('benchmark')
+class ImportThroughputBenchmark(BenchmarkMixin, TestCase):
+    """
+    Placement batches inside ``bulk_import()``, as ``manage.py import_markers``
+    writes them: the per-batch rate must not fall as the table grows.
+    """
+
+    BATCH_SIZE = 500
+    BATCHES = 8
+
+    def placements(self):
+        validator = MarkerPlacementSerializer()
+        for index, (latitude, longitude) in enumerate(city_points(self.BATCH_SIZE * self.BATCHES)):
+            if index % 3:
+                owner = {'business': {
+                    'bsns_name': f'Shop {index}', 'bsns_address': 'Main St', 'industry': INDUSTRIES[index % 3],
+                }}
+            else:
+                owner = {'investible': {'invst_location': f'Lot {index}', 'invst_description': 'Vacant lot'}}
+            yield validator.run_validation({'latitude': latitude, 'longitude': longitude, **owner})
+
+    def test_batch_rate_does_not_decay(self):
+        placements = list(self.placements())
+        rates = []
+        with bulk_import():
+            for start in range(0, len(placements), self.BATCH_SIZE):
+                started = time.perf_counter()
+                place_markers(placements[start:start + self.BATCH_SIZE])
+                rates.append(self.BATCH_SIZE / (time.perf_counter() - started))
+        self.assertEqual(Marker.objects.count(), len(placements))
+        summary = ', '.join(f'{rate:.0f}' for rate in rates) + ' markers/s per batch'
+        self.report(summary)
+        self.assertGreater(statistics.mean(rates[-2:]), 0.5 * statistics.mean(rates[:2]), summary)
+
+
+class ImportMarkersTests(TestCase):
+
+    def import_geojson(self, features):
+        handle, path = tempfile.mkstemp(suffix='.geojson')
+        with os.fdopen(handle, 'w') as geojson:
+            json.dump({'type': 'FeatureCollection', 'features': features}, geojson)
+        self.addCleanup(os.remove, path)
+        out = io.StringIO()
+        call_command('import_markers', path, '--restart', stdout=out)
+        return out.getvalue()
+
+    def test_geojson_positions_and_malformed_geometry(self):
+        (lat1, lon1), (lat2, lon2) = city_points(2)
+        business = {'bsns_name': 'Shop', 'bsns_address': 'Main St', 'industry': 'mall'}
+        output = self.import_geojson([
+            {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon1, lat1]}, 'properties': business},
+            # Altitude is ignored
+            {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon2, lat2, 12.5]}, 'properties': business},
+            {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon1]}, 'properties': business},
+            {'type': 'Feature', 'geometry': {'type': 'LineString', 'coordinates': [[lon1, lat1], [lon2, lat2]]},
+             'properties': business},
+            {'type': 'Feature', 'geometry': None, 'properties': business},
+        ])
+        self.assertIn('Imported 2 markers (3 rows skipped)', output)
+        self.assertEqual(
+            sorted(Marker.objects.values_list('latitude', 'longitude')), sorted([(lat1, lon1), (lat2, lon2)]),
+        )
+
+
+class StatsCacheTests(TestCase):
+    """
+    Stats are cached per model version, so a write made by another worker
+    process (simulated here by a signal-less update plus a version bump) is
+    visible without any local invalidation.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_markers(10)
+
+    def setUp(self):
+        caches['default'].clear()
+
+    def test_other_process_writes_retire_entries(self):
+        self.assertEqual(business_stats()['by_status']['active'], 5)
+        self.assertEqual(investible_stats()['by_status']['available'], 5)
+        markers = sum(zone['markers'] for zone in zone_stats())
+
+        Business.objects.filter(business_id=1).update(status='inactive')
+        self.assertEqual(business_stats()['by_status']['active'], 5)
+        bump_version(Business)
+        self.assertEqual(business_stats()['by_status']['active'], 4)
+
+        Investible.objects.filter(investible_id=2).update(status='sold')
+        bump_version(Investible)
+        self.assertEqual(investible_stats()['by_status']['available'], 4)
+
+        Marker.objects.filter(marker_id=10).delete()
+        self.assertEqual(sum(zone['markers'] for zone in zone_stats()), markers - 1)
+
+
+def place(points, industry='mall', kind='business'):
+    """
+    Places business (or investible) markers at ``points`` through place_markers, as the API does.
+    """
+    owners = {
+        'business': lambda index: {'bsns_name': f'Shop {index}', 'bsns_address': 'Main St', 'industry': industry},
+        'investible': lambda index: {'invst_location': f'Lot {index}', 'invst_description': 'Vacant lot'},
+    }
+    return place_markers([
+        {'latitude': latitude, 'longitude': longitude, 'label': f'Marker {index}', kind: owners[kind](index)}
+        for index, (latitude, longitude) in enumerate(points)
+    ])
+
+
+class ClusterIndexTests(TestCase):
+    """
+    Writes reach the process-wide cluster index incrementally (no rebuild),
+    and leave it equal to one freshly built from the table.
+    """
+
+    ZOOMS = (0, 8, 12, 15, 18)
+
+    def setUp(self):
+        reset_cluster_index()
+        self.addCleanup(reset_cluster_index)
+
+    @staticmethod
+    def normalized(clusters):
+        return sorted(
+            (cluster['count'], round(cluster['latitude'], 9), round(cluster['longitude'], 9),
+             sorted(cluster['industries'].items()))
+            for cluster in clusters
+        )
+
+    def assertMatchesRebuild(self):
+        fresh = MarkerClusterIndex()
+        fresh.load(Marker.objects.values_list('marker_id', 'latitude', 'longitude', 'business__industry'))
+        for zoom in self.ZOOMS:
+            response = self.client.get('/api/markers/clusters/', {'z': zoom})
+            self.assertEqual(self.normalized(response.json()), self.normalized(fresh.clusters(zoom)), zoom)
+
+    def test_incremental_writes_match_rebuild(self):
+        points = city_points(40, seed=1)
+        with self.captureOnCommitCallbacks(execute=True):
+            markers = place(points[:30], industry='mall')
+        index = get_cluster_index()
+        self.assertEqual(index.versions, current_versions(*INDEX_MODELS))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            place(points[30:], industry='school')
+        moved = markers[0]
+        moved.latitude, moved.longitude = points[-1]
+        with self.captureOnCommitCallbacks(execute=True):
+            moved.save()
+        business = markers[1].business
+        business.industry = 'hospital'
+        with self.captureOnCommitCallbacks(execute=True):
+            business.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            markers[2].delete()
+        # Cascades to the business's marker
+        with self.captureOnCommitCallbacks(execute=True):
+            markers[3].business.delete()
+
+        # Every write was applied in place rather than by a rebuild
+        self.assertIs(get_cluster_index(), index)
+        self.assertEqual(Marker.objects.count(), 38)
+        self.assertMatchesRebuild()
+
+
+def write_markers():
+    """
+    Runs a mix of committed marker, business and investible writes through the
+    bulk placement path and the model signals: creates, a move, category
+    changes, deletes and owner cascades.
+    """
+    points = city_points(30, seed=2)
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        businesses = place(points[:12], industry='mall')
+        investibles = place(points[12:20], kind='investible')
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        single = Marker.objects.create(
+            label='Single', latitude=points[20][0], longitude=points[20][1],
+            business=Business.objects.create(bsns_name='Single', bsns_address='Main St', industry='school'),
+        )
+    moved = businesses[0]
+    moved.latitude, moved.longitude = points[21]
+    business = businesses[1].business
+    business.industry, business.status = 'office', 'inactive'
+    investible = investibles[0].invst
+    investible.status = 'sold'
+    for instance in (moved, business, investible):
+        with TestCase.captureOnCommitCallbacks(execute=True):
+            instance.save()
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        businesses[2].delete()
+        investibles[1].delete()
+        # Cascades to the business's marker
+        businesses[3].business.delete()
+        single.business.delete()
+
+
+class HeatmapCounterTests(TestCase):
+
+    @staticmethod
+    def counters():
+        counts = Counter()
+        fields = ('cell_size', 'kind', 'industry', 'status', 'row', 'col', 'count')
+        for *key, count in DensityCell.objects.values_list(*fields):
+            counts[tuple(key)] += count
+        return {key: count for key, count in counts.items() if count}
+
+    def test_incremental_counters_match_rebuild(self):
+        write_markers()
+        incremental = self.counters()
+        self.assertTrue(incremental)
+        rebuild_heatmap()
+        self.assertEqual(incremental, self.counters())
+
+
+class ReportRollupTests(TestCase):
+
+    @staticmethod
+    def rollups():
+        counts = Counter()
+        for day, business_id, investible_id, count in ReportRollup.objects.values_list(
+            'day', 'business_id', 'investible_id', 'count'
+        ):
+            counts[day, business_id, investible_id] += count
+        return {key: count for key, count in counts.items() if count}
+
+    def test_signal_rollups_match_rebuild(self):
+        points = city_points(6, seed=3)
+        with self.captureOnCommitCallbacks(execute=True):
+            businesses = place(points[:3])
+            investibles = place(points[3:], kind='investible')
+        reports = []
+        for marker in businesses + investibles:
+            for number in range(3):
+                reports.append(Report.objects.create(
+                    report_description=f'Report {number}', business=marker.business, investible=marker.invst,
+                ))
+        # Redating a report moves it to another day's rollup
+        earlier = reports[0]
+        earlier.report_date -= timedelta(days=3)
+        earlier.save()
+
+        reports[1].delete()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('staff', 'staff@example.com', 'password'))
+        # Deleting a business's or investible's last marker deletes it and, by cascade, its reports
+        for marker in (businesses[1], investibles[0]):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(client.delete(f'/api/markers/{marker.pk}/').status_code, 204)
+
+        self.assertEqual(Report.objects.count(), 11)
+        incremental = self.rollups()
+        rebuild_report_rollups()
+        self.assertEqual(incremental, self.rollups())
+
+
+class DashboardSummaryTests(TestCase):
+
+    def test_adjusted_summary_matches_fresh_count(self):
+        # Created from a full count up front, so every write below is applied as a delta
+        self.assertEqual(get_summary().counts['markers']['total'], 0)
+        user = User.objects.create_user('staff', 'staff@example.com', 'password')
+        write_markers()
+        business = Business.objects.filter(business_markers__isnull=False).first()
+        for number in range(3):
+            Report.objects.create(report_description=f'Report {number}', business=business)
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.delete(f'/api/markers/{business.business_markers.get().pk}/')
+        self.assertEqual(response.status_code, 204)
+        User.objects.create_user('viewer', 'viewer@example.com', 'password').delete()
+
+        summary = get_summary()
+        self.assertGreater(summary.version, 1)
+        self.assertEqual(summary.counts['markers']['total'], Marker.objects.count())
+        self.assertEqual(check_summary(), [])
+
+
+class SyncTests(TestCase):
+    """
+    /api/sync/ deltas under a controlled clock: tombstones report deletes,
+    and tokens overlap the previous call by SYNC_OVERLAP.
+    """
+
+    def setUp(self):
+        self.now = timezone.now()
+        patcher = mock.patch('django.utils.timezone.now', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = APIClient()
+
+    def tick(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+    def sync(self, token=None):
+        response = self.client.get('/api/sync/', {'since': token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_tombstones_and_overlap(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            markers = place(city_points(3, seed=4))
+        self.tick(60)
+        snapshot = self.sync()
+        self.assertTrue(snapshot['full'])
+        self.assertEqual(len(snapshot['markers']), 3)
+
+        # Nothing written since the token
+        self.tick(60)
+        delta = self.sync(snapshot['token'])
+        self.assertFalse(delta['full'])
+        self.assertEqual((delta['markers'], delta['businesses'], delta['investibles']), ([], [], []))
+        self.assertEqual(delta['deleted'], {'marker': [], 'business': [], 'investible': []})
+
+        self.tick(60)
+        user = User.objects.create_user('staff', 'staff@example.com', 'password')
+        self.client.force_authenticate(user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(f'/api/markers/{markers[0].pk}/').status_code, 204)
+        self.client.force_authenticate(None)
+        self.tick(1)
+        delta = self.sync(delta['token'])
+        self.assertEqual(delta['markers'], [])
+        self.assertEqual(delta['deleted']['marker'], [markers[0].pk])
+        # The business went with its last marker
+        self.assertEqual(delta['deleted']['business'], [markers[0].business_id])
+
+        # A write just before a sync is inside the next token's overlap, so it is sent again
+        self.tick(60)
+        moved = markers[1]
+        moved.label = 'Moved'
+        moved.save()
+        self.tick(2)
+        first = self.sync(delta['token'])
+        self.assertEqual([marker['marker_id'] for marker in first['markers']], [moved.pk])
+        self.tick(60)
+        again = self.sync(first['token'])
+        self.assertEqual([marker['marker_id'] for marker in again['markers']], [moved.pk])
+        self.assertEqual(self.sync(again['token'])['markers'], [])
+
+
+class SearchRankingTests(TestCase):
+    """
+    A query one character off a business name still ranks that business
+    first, ahead of names sharing part of it.
+    """
+
+    NAMES = ('Jollibee', 'Jolly Hardware', 'Bee Pharmacy', 'Jolina Bakery', 'Mang Inasal', 'Chowking')
+
+    @classmethod
+    def setUpTestData(cls):
+        points = city_points(len(cls.NAMES), seed=5)
+        with cls.captureOnCommitCallbacks(execute=True):
+            place_markers([
+                {'latitude': latitude, 'longitude': longitude, 'label': name,
+                 'business': {'bsns_name': name, 'bsns_address': 'Main St', 'industry': 'food'}}
+                for name, (latitude, longitude) in zip(cls.NAMES, points)
+            ])
+
+    def test_misspelling_ranks_intended_business_first(self):
+        client = APIClient()
+        for query in ('Jollibee', 'Jolibee', 'Jollibe', 'Jollybee', 'Jollibbee'):
+            with self.subTest(query=query):
+                response = client.get('/api/search/', {'q': query})
+                self.assertEqual(response.status_code, 200)
+                results = response.json()
+                self.assertEqual(results[0]['title'], 'Jollibee')
+                self.assertEqual(len(results[0]['markers']), 1)
+                self.assertGreater(results[0]['score'], results[1]['score'])
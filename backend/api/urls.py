@@ -3,8 +3,14 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import UserViewSet, MarkerViewSet, ReportViewSet, BusinessViewSet, InvestibleViewSet 
 from .views import (get_all_investibles, get_investible, create_investible,update_investible, delete_investibles,
-                    get_users, create_user, update_user, login_view, logout_view, refresh_token_view, protected_view
+                    get_users, create_user, update_user, login_view, logout_view, refresh_token_view, protected_view,
+                    marker_tile, export_markers_geojson, export_businesses, export_investibles, export_reports,
+                    get_business_stats, get_investible_stats,
+                    get_response_cache_stats, sync_changes, search_records, get_heatmap,
+                    get_zone_stats, get_report_stats, get_dashboard_summary
                     )
+from .async_views import (async_marker_list, async_business_list, async_business_detail,
+                          async_investible_list, async_investible_detail, marker_events)
 
 router = DefaultRouter()
 router.register(r'user', UserViewSet, basename='user')
@@ -23,7 +29,39 @@ urlpatterns = [
     path('logout/', logout_view, name='logout'),
     path('refresh/', refresh_token_view, name='token_refresh'),
     path('protected/', protected_view, name='protected_view'),
+
+    # Vector tiles
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', marker_tile, name='marker_tile'),
     
+    # Stats
+    path('stats/businesses/', get_business_stats, name='business_stats'),
+    path('stats/investibles/', get_investible_stats, name='investible_stats'),
+    path('stats/zones/', get_zone_stats, name='zone_stats'),
+    path('stats/reports/', get_report_stats, name='report_stats'),
+    path('dashboard/summary/', get_dashboard_summary, name='dashboard_summary'),
+    path('stats/response-cache/', get_response_cache_stats, name='response_cache_stats'),
+
+    # Search
+    path('search/', search_records, name='search_records'),
+    path('heatmap/', get_heatmap, name='heatmap'),
+
+    # Incremental sync
+    path('sync/', sync_changes, name='sync_changes'),
+
+    # Async read paths (served natively by the ASGI app)
+    path('async/markers/', async_marker_list, name='async_marker_list'),
+    path('async/businesses/', async_business_list, name='async_business_list'),
+    path('async/businesses/<int:pk>/', async_business_detail, name='async_business_detail'),
+    path('async/investibles/', async_investible_list, name='async_investible_list'),
+    path('async/investibles/<int:pk>/', async_investible_detail, name='async_investible_detail'),
+
+    # Exports (ahead of the router so markers/<pk>/ does not shadow them)
+    path('markers/export.geojson', export_markers_geojson, name='export_markers_geojson'),
+    path('businesses/export.<str:fmt>', export_businesses, name='export_businesses'),
+    path('investibles/export.<str:fmt>', export_investibles, name='export_investibles'),
+    path('reports/export.<str:fmt>', export_reports, name='export_reports'),
+    path('markers/events/', marker_events, name='marker_events'),
+
     # User URLs (from router)
     path('', include(router.urls)),
     
@@ -0,0 +1,189 @@
+import math
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+from .clustering import project
+from .conditional import current_versions
+from .models import Business, Investible, Marker
+
+# Highest zoom level served (and cached); matches the deepest Leaflet zoom in use.
+MAX_TILE_ZOOM = 20
+
+TILE_EXTENT = 4096
+LAYER_NAME = 'markers'
+
+# Models whose fields are encoded in tiles
+TILE_MODELS = (Marker, Business, Investible)
+
+
+def get_tile_cache_dir():
+    return Path(getattr(settings, 'TILE_CACHE_DIR', settings.BASE_DIR / 'tile_cache'))
+
+
+def tile_bounds(z, x, y):
+    """
+    Returns the ``(min_lon, min_lat, max_lon, max_lat)`` covered by an XYZ tile.
+    """
+    n = 2 ** z
+
+    def lat(ty):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * ty / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def tiles_for_point(latitude, longitude):
+    """
+    Yields the ``(z, x, y)`` of every cached tile that contains a point.
+    """
+    px, py = project(latitude, longitude)
+    for z in range(MAX_TILE_ZOOM + 1):
+        n = 2 ** z
+        yield z, min(int(px * n), n - 1), min(int(py * n), n - 1)
+
+
+# Minimal Mapbox Vector Tile (protobuf) encoding, points only.
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _zigzag(value):
+    return (value << 1) if value >= 0 else ((-value << 1) - 1)
+
+
+def _field(number, wire_type):
+    return _varint((number << 3) | wire_type)
+
+
+def _message(number, payload):
+    return _field(number, 2) + _varint(len(payload)) + payload
+
+
+def _packed(number, values):
+    return _message(number, b''.join(_varint(value) for value in values))
+
+
+def encode_tile(features):
+    """
+    Encodes ``(feature_id, tile_x, tile_y, properties)`` tuples as a single-layer MVT.
+    """
+    keys, values = {}, {}
+    encoded_features = []
+    for feature_id, tile_x, tile_y, properties in features:
+        tags = []
+        for key, value in properties.items():
+            if value is None:
+                continue
+            value = str(value)
+            tags.append(keys.setdefault(key, len(keys)))
+            tags.append(values.setdefault(value, len(values)))
+        geometry = [(1 << 3) | 1, _zigzag(tile_x), _zigzag(tile_y)]  # MoveTo, one point
+        encoded_features.append(
+            _field(1, 0) + _varint(feature_id)
+            + _packed(2, tags)
+            + _field(3, 0) + _varint(1)  # GeomType.POINT
+            + _packed(4, geometry)
+        )
+    if not encoded_features:
+        return b''
+    layer = (
+        _field(15, 0) + _varint(2)
+        + _message(1, LAYER_NAME.encode())
+        + b''.join(_message(2, feature) for feature in encoded_features)
+        + b''.join(_message(3, key.encode()) for key in keys)
+        + b''.join(_message(4, _message(1, value.encode())) for value in values)
+        + _field(5, 0) + _varint(TILE_EXTENT)
+    )
+    return _message(3, layer)
+
+
+def build_tile(z, x, y):
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    rows = Marker.objects.filter(
+        latitude__range=(min_lat, max_lat),
+        longitude__range=(min_lon, max_lon),
+    ).values_list(
+        'marker_id', 'latitude', 'longitude', 'label',
+        'business__industry', 'business__status', 'invst__status',
+    )
+    n = 2 ** z
+    features = []
+    for marker_id, latitude, longitude, label, industry, status, investible_status in rows.iterator():
+        px, py = project(latitude, longitude)
+        tile_x = int((px * n - x) * TILE_EXTENT)
+        tile_y = int((py * n - y) * TILE_EXTENT)
+        # The bbox filter is inclusive, so drop points owned by the neighbouring tile
+        if not (0 <= tile_x < TILE_EXTENT and 0 <= tile_y < TILE_EXTENT):
+            continue
+        features.append((marker_id, tile_x, tile_y, {
+            'label': label,
+            'industry': industry,
+            'status': status,
+            'investible_status': investible_status,
+        }))
+    return encode_tile(features)
+
+
+def _tile_path(z, x, y):
+    return get_tile_cache_dir() / str(z) / str(x) / f'{y}.mvt'
+
+
+def get_tile(z, x, y):
+    """
+    Returns the encoded tile, serving it from the filesystem cache when present.
+    """
+    path = _tile_path(z, x, y)
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        pass
+    versions = current_versions(*TILE_MODELS)
+    data = build_tile(z, x, y)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so readers never see a partial tile
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'wb') as tmp:
+        tmp.write(data)
+    os.replace(tmp_path, path)
+    # Writers invalidate tiles after they commit (signals.py). One that
+    # committed while this tile was built may have done so before it was
+    # stored, so a tile built across a version change is not kept.
+    if current_versions(*TILE_MODELS) != versions:
+        path.unlink(missing_ok=True)
+    return data
+
+
+def invalidate_point(latitude, longitude):
+    """
+    Removes the cached tiles containing a point at every zoom level.
+    """
+    for z, x, y in tiles_for_point(latitude, longitude):
+        try:
+            _tile_path(z, x, y).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def invalidate_markers(markers):
+    for latitude, longitude in markers:
+        invalidate_point(latitude, longitude)
+
+
+def clear_tile_cache():
+    """
+    Drops every cached tile, for bulk writes that touch too many tiles to invalidate one by one.
+    """
+    shutil.rmtree(get_tile_cache_dir(), ignore_errors=True)
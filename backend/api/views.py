@@ -1,12 +1,40 @@
 # MultipleFiles/views.py
 
+from datetime import date, datetime, time, timedelta
+
 from django.conf import settings
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework import status
-from .models import User, Business, Investible, Report, Marker
+from rest_framework.exceptions import ValidationError
+from .models import User, Business, Investible, Report, Marker, InvestibleCatchment
 from .serializers import UserSerializer, BusinessSerializer, InvestibleSerializer, MarkerSerializer, ReportSerializer
+from .serializers import MarkerPlacementSerializer, InvestibleCatchmentSerializer
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from .clustering import get_cluster_index
+from .spatial import get_spatial_index, reset_spatial_index
+from .vector_tiles import MAX_TILE_ZOOM, get_tile
+from .exports import iter_marker_geojson, iter_csv, iter_xlsx
+from .exports import BUSINESS_EXPORT_FIELDS, INVESTIBLE_EXPORT_FIELDS, REPORT_EXPORT_FIELDS
+from .stats import business_stats, investible_stats, zone_stats
+from .pagination import OptInCursorPagination
+from .filters import QueryParamFilter, StableOrderingFilter
+from .conditional import conditional_on
+from .response_cache import cached_on, response_cache_stats
+from django.utils.decorators import method_decorator
+from django.db import transaction
+from .sync import changes_since, decode_token
+from .search import search
+from .catchment import CATCHMENT_RADII, compute_catchments
+from .heatmap import HEATMAP_CELL_SIZES, heatmap
+from .report_rollups import BUCKETS, report_series
+from .dashboard import get_summary
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils import timezone
+from .geohash import bbox_q
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework.permissions import AllowAny, IsAuthenticated # Import AllowAny
 # TOKEN
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -128,17 +156,177 @@ def protected_view(request):
         }
     })
 
+def parse_bbox(value):
+    """
+    Parses a ``minLon,minLat,maxLon,maxLat`` query value into four floats.
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(','))
+    except ValueError:
+        raise ValidationError({'bbox': 'Expected bbox=minLon,minLat,maxLon,maxLat.'})
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValidationError({'bbox': 'Minimum coordinates must not exceed maximum coordinates.'})
+    return min_lon, min_lat, max_lon, max_lat
+
+def parse_positive_int(params, name, default=None, maximum=None):
+    """
+    Reads an optional positive integer query parameter, clamped to ``maximum``.
+    """
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be an integer.'})
+    if value < 1:
+        raise ValidationError({name: 'Must be a positive integer.'})
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+def filter_bbox(queryset, bbox):
+    """
+    Restricts a Marker queryset to a ``(min_lon, min_lat, max_lon, max_lat)`` bbox.
+    """
+    return queryset.filter(bbox_q(*bbox))
+
+def list_response(request, queryset, serializer_class):
+    """
+    Serializes ``queryset`` for a function-based list view, as one cursor page
+    when the client opted into pagination and as a full list otherwise.
+    """
+    paginator = OptInCursorPagination()
+    page = paginator.paginate_queryset(queryset, request)
+    if page is not None:
+        return paginator.get_paginated_response(serializer_class(page, many=True).data)
+    return Response(serializer_class(queryset, many=True).data)
+
+def parse_coordinate(params, name, limit):
+    try:
+        value = float(params.get(name))
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'A number is required.'})
+    if not -limit <= value <= limit:
+        raise ValidationError({name: f'Must be between -{limit} and {limit}.'})
+    return value
+
 class MarkerViewSet(viewsets.ModelViewSet):
-    queryset = Marker.objects.all()
+    # Nested business/investible data is joined in, keeping list and detail at one query
+    queryset = Marker.objects.select_related('business', 'invst')
     serializer_class = MarkerSerializer
+    max_limit = 5000
+    filter_backends = [QueryParamFilter, StableOrderingFilter]
+    # ?status= matches a business marker's business or an investible marker's investible
+    filter_params = {
+        'status': ('business__status', 'invst__status'),
+        'industry': 'business__industry',
+        'area': 'invst__area',
+        'preferred_business': 'invst__preferred_business',
+    }
+    # Cursor pages read the ordering value off each row, so only local fields
+    ordering_fields = ['marker_id', 'label', 'created_at', 'updated_at']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        bbox = self.request.query_params.get('bbox')
+        if self.action == 'list' and bbox:
+            queryset = filter_bbox(queryset, parse_bbox(bbox))
+        zone = parse_positive_int(self.request.query_params, 'zone')
+        if self.action == 'list' and zone is not None:
+            queryset = queryset.filter(zone_id=zone)
+        return queryset
+
+    @method_decorator(conditional_on(Marker, Business, Investible))
+    @method_decorator(cached_on(Marker, Business, Investible))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @method_decorator(conditional_on(Marker, Business, Investible))
+    @method_decorator(cached_on(Marker, Business, Investible))
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        limit = parse_positive_int(request.query_params, 'limit', maximum=self.max_limit)
+        if limit is not None:
+            queryset = (queryset if queryset.ordered else queryset.order_by('marker_id'))[:limit]
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'clusters', 'nearest', 'within']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    @action(detail=False, methods=['get'])
+    def clusters(self, request):
+        zoom = request.query_params.get('z')
+        try:
+            zoom = int(zoom)
+        except (TypeError, ValueError):
+            raise ValidationError({'z': 'A zoom level is required.'})
+        bbox = request.query_params.get('bbox')
+        bbox = parse_bbox(bbox) if bbox else None
+        return Response(get_cluster_index().clusters(zoom, bbox))
+
+    def _with_distances(self, search):
+        """
+        Serializes the ``(distance_m, marker_id)`` matches ``search(index)``
+        returns. A match whose row is gone means a delete committed after the
+        index was checked, so the index is rebuilt and searched once more.
+        """
+        for attempt in range(2):
+            matches = search(get_spatial_index())
+            markers = self.get_queryset().in_bulk([marker_id for _, marker_id in matches])
+            if len(markers) == len(matches) or attempt:
+                break
+            reset_spatial_index()
+        results = []
+        for distance, marker_id in matches:
+            if marker_id in markers:
+                data = self.get_serializer(markers[marker_id]).data
+                data['distance_m'] = round(distance, 1)
+                results.append(data)
+        return results
+
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        latitude = parse_coordinate(request.query_params, 'lat', 90)
+        longitude = parse_coordinate(request.query_params, 'lon', 180)
+        k = parse_positive_int(request.query_params, 'k', default=10, maximum=100)
+        return Response(self._with_distances(lambda index: index.nearest(latitude, longitude, k)))
+
+    @action(detail=False, methods=['get'])
+    def within(self, request):
+        latitude = parse_coordinate(request.query_params, 'lat', 90)
+        longitude = parse_coordinate(request.query_params, 'lon', 180)
+        try:
+            radius = float(request.query_params.get('radius_m'))
+        except (TypeError, ValueError):
+            raise ValidationError({'radius_m': 'A radius in meters is required.'})
+        if not 0 < radius <= 50000:
+            raise ValidationError({'radius_m': 'Must be greater than 0 and at most 50000.'})
+        limit = parse_positive_int(request.query_params, 'limit', default=500, maximum=self.max_limit)
+        return Response(self._with_distances(lambda index: index.within(latitude, longitude, radius)[:limit]))
+
+    @action(detail=False, methods=['post'])
+    def place(self, request):
+        """
+        Creates business/investible + marker pairs atomically; accepts an object or an array.
+        """
+        many = isinstance(request.data, list)
+        extra = {'max_length': self.max_limit} if many else {}
+        serializer = MarkerPlacementSerializer(data=request.data, many=many, **extra)
+        serializer.is_valid(raise_exception=True)
+        # Marker events go out from signals.py once the placement commits
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs, partial=True)
 
@@ -161,6 +349,10 @@ class MarkerViewSet(viewsets.ModelViewSet):
 class BusinessViewSet(viewsets.ModelViewSet):
     queryset = Business.objects.all()
     serializer_class = BusinessSerializer
+    filter_backends = [QueryParamFilter, StableOrderingFilter]
+    # status/industry filters are served by business_status_industry_idx
+    filter_params = {'status': 'status', 'industry': 'industry'}
+    ordering_fields = ['business_id', 'bsns_name', 'industry', 'status', 'created_at', 'updated_at']
 
     # --- MODIFIED PERMISSIONS HERE ---
     def get_permissions(self):
@@ -174,17 +366,30 @@ class BusinessViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
     # --- END MODIFIED PERMISSIONS ---
 
+    @method_decorator(conditional_on(Business))
+    @method_decorator(cached_on(Business))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional_on(Business))
+    @method_decorator(cached_on(Business))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
 
 # BUSINESS (These function-based views also need permission_classes)
 @api_view(['GET'])
 @permission_classes([AllowAny]) # Allow any for public access
+@conditional_on(Business)
+@cached_on(Business)
 def get_all_businesses(request):
     businesses = Business.objects.all()
-    serializer = BusinessSerializer(businesses, many=True)
-    return Response(serializer.data)
+    return list_response(request, businesses, BusinessSerializer)
 
 @api_view(['GET'])
 @permission_classes([AllowAny]) # Allow any for public access
+@conditional_on(Business)
+@cached_on(Business)
 def get_business(request, pk):
     try:
         business = Business.objects.get(business_id=pk)
@@ -236,36 +441,83 @@ def update_business(request, pk):
 class InvestibleViewSet(viewsets.ModelViewSet):
     queryset = Investible.objects.all()
     serializer_class = InvestibleSerializer
+    filter_backends = [QueryParamFilter, StableOrderingFilter]
+    # status/area filters are served by investible_status_area_idx
+    filter_params = {'status': 'status', 'area': 'area', 'preferred_business': 'preferred_business'}
+    ordering_fields = ['investible_id', 'status', 'area', 'preferred_business', 'created_at', 'updated_at']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Zone membership comes from the indexed Marker.zone, not the free-text area
+        zone = parse_positive_int(self.request.query_params, 'zone')
+        if self.action == 'list' and zone is not None:
+            queryset = queryset.filter(investment_markers__zone_id=zone).distinct()
+        return queryset
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'catchment']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    @method_decorator(conditional_on(Investible))
+    @method_decorator(cached_on(Investible))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional_on(Investible))
+    @method_decorator(cached_on(Investible))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     # ✅ ADD THIS to allow partial updates like MarkerViewSet
     def update(self, request, *args, **kwargs):
         return super().update(request, *args, **kwargs, partial=True)
 
+    @action(detail=True, methods=['get'])
+    def catchment(self, request, pk=None):
+        # Served from the InvestibleCatchment cache kept current by signals.py;
+        # computed on first request for rows written before the cache existed
+        investible = self.get_object()
+        catchment = InvestibleCatchment.objects.filter(pk=investible.pk).first()
+        if catchment is None:
+            compute_catchments([investible.pk])
+            catchment = InvestibleCatchment.objects.filter(pk=investible.pk).first()
+        if catchment is None:
+            return Response({'error': 'Investible has no marker'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(dict(InvestibleCatchmentSerializer(catchment).data, radii=CATCHMENT_RADII))
+
 #CRUD Reports (These should likely remain protected)
 class ReportViewSet(viewsets.ModelViewSet):
-    queryset = Report.objects.all()
+    queryset = Report.objects.select_related('business', 'investible')
     serializer_class = ReportSerializer
     permission_classes = [IsAuthenticated] # Keep protected
 
+    @method_decorator(conditional_on(Report, Business, Investible))
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @method_decorator(conditional_on(Report, Business, Investible))
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         print(request.data)  
         return super().create(request, *args, **kwargs)
 
+    def perform_create(self, serializer):
+        # The report and its rollup increment (signals.py) commit together
+        with transaction.atomic():
+            super().perform_create(serializer)
+
 
 # USERS (These should likely remain protected, except for create_user)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated]) # Getting all users should be protected
 def get_users(request):
     users = User.objects.all()
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+    return list_response(request, users, UserSerializer)
 
 @api_view(['POST'])
 @permission_classes([AllowAny]) # Allowing anyone to create a user (e.g., for registration)
@@ -341,13 +593,16 @@ class UserViewSet(viewsets.ModelViewSet):
 #CRUD Investibles (These function-based views also need permission_classes)
 @api_view(['GET']) # Fetch all investibles
 @permission_classes([AllowAny]) # Allow any for public access
+@conditional_on(Investible)
+@cached_on(Investible)
 def get_all_investibles(request):
     investibles = Investible.objects.all()
-    serializer = InvestibleSerializer(investibles, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return list_response(request, investibles, InvestibleSerializer)
 
 @api_view(['GET']) # Search investible
 @permission_classes([AllowAny]) # Allow any for public access
+@conditional_on(Investible)
+@cached_on(Investible)
 def get_investible(request, pk):
     try:
         investible = Investible.objects.get(investible_id=pk)
@@ -401,3 +656,186 @@ def delete_investibles(request, pk):
     
     investible.delete()  # CHANGE THIS LINE
     return Response({'message': 'Investible deleted successfully'}, status=200)  # CHANGE THIS LINE
+
+
+# VECTOR TILES
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def marker_tile(request, z, x, y):
+    if z > MAX_TILE_ZOOM or x >= 2 ** z or y >= 2 ** z:
+        return Response({'error': 'Tile out of range'}, status=status.HTTP_404_NOT_FOUND)
+    return HttpResponse(get_tile(z, x, y), content_type='application/vnd.mapbox-vector-tile')
+
+
+# EXPORTS
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def export_markers_geojson(request):
+    queryset = Marker.objects.all()
+    bbox = request.query_params.get('bbox')
+    if bbox:
+        queryset = filter_bbox(queryset, parse_bbox(bbox))
+    response = StreamingHttpResponse(iter_marker_geojson(queryset), content_type='application/geo+json')
+    response['Content-Disposition'] = 'attachment; filename="markers.geojson"'
+    return response
+
+EXPORT_FORMATS = {
+    'csv': (iter_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (iter_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+def filter_date_range(queryset, field, params):
+    # ?from=/?to= are inclusive local dates, compared as datetime bounds so the column index is used
+    start, end = parse_date_param(params, 'from'), parse_date_param(params, 'to')
+    if start and end and start > end:
+        raise ValidationError({'from': 'Must not be after to.'})
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': timezone.make_aware(datetime.combine(start, time.min))})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lt': timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))})
+    return queryset
+
+def export_response(queryset, export_fields, fmt, name):
+    if fmt not in EXPORT_FORMATS:
+        return Response({'error': f'Format must be one of {", ".join(EXPORT_FORMATS)}.'}, status=status.HTTP_404_NOT_FOUND)
+    generate, content_type = EXPORT_FORMATS[fmt]
+    rows = generate(queryset, export_fields) if fmt == 'csv' else generate(queryset, export_fields, name)
+    response = StreamingHttpResponse(rows, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{name}.{fmt}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def export_businesses(request, fmt):
+    # Same ?status=/?industry= filters as the business list, plus ?from=/?to= on created_at
+    queryset = QueryParamFilter().filter_queryset(request, Business.objects.all(), BusinessViewSet)
+    queryset = filter_date_range(queryset, 'created_at', request.query_params)
+    return export_response(queryset, BUSINESS_EXPORT_FIELDS, fmt, 'businesses')
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def export_investibles(request, fmt):
+    queryset = QueryParamFilter().filter_queryset(request, Investible.objects.all(), InvestibleViewSet)
+    zone = parse_positive_int(request.query_params, 'zone')
+    if zone is not None:
+        queryset = queryset.filter(investment_markers__zone_id=zone).distinct()
+    queryset = filter_date_range(queryset, 'created_at', request.query_params)
+    return export_response(queryset, INVESTIBLE_EXPORT_FIELDS, fmt, 'investibles')
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_reports(request, fmt):
+    queryset = filter_date_range(Report.objects.all(), 'report_date', request.query_params)
+    business = parse_positive_int(request.query_params, 'business')
+    if business is not None:
+        queryset = queryset.filter(business_id=business)
+    investible = parse_positive_int(request.query_params, 'investible')
+    if investible is not None:
+        queryset = queryset.filter(investible_id=investible)
+    return export_response(queryset, REPORT_EXPORT_FIELDS, fmt, 'reports')
+
+
+# STATS
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_business_stats(request):
+    return Response(business_stats())
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_investible_stats(request):
+    return Response(investible_stats())
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_zone_stats(request):
+    return Response(zone_stats())
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: 'Expected a YYYY-MM-DD date.'})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@conditional_on(Report, Business)
+@cached_on(Report, Business)
+def get_report_stats(request):
+    params = request.query_params
+    bucket = params.get('bucket') or 'day'
+    if bucket not in BUCKETS:
+        raise ValidationError({'bucket': f'Must be one of {", ".join(BUCKETS)}.'})
+    start, end = parse_date_param(params, 'from'), parse_date_param(params, 'to')
+    if start and end and start > end:
+        raise ValidationError({'from': 'Must not be after to.'})
+    return Response(report_series(
+        bucket, start, end,
+        business=parse_positive_int(params, 'business'),
+        investible=parse_positive_int(params, 'investible'),
+    ))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_response_cache_stats(request):
+    return Response(response_cache_stats())
+
+
+# SYNC
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def sync_changes(request):
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = decode_token(since)
+        except (ValueError, OverflowError, OSError):
+            return Response({'error': 'Invalid sync token'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(changes_since(since or None))
+
+
+# SEARCH
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_records(request):
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'The q parameter is required.'}, status=status.HTTP_400_BAD_REQUEST)
+    limit = parse_positive_int(request.query_params, 'limit', default=20, maximum=100)
+    return Response(search(query, limit=limit))
+
+
+# HEATMAP
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@conditional_on(Marker, Business, Investible)
+@cached_on(Marker, Business, Investible)
+def get_heatmap(request):
+    # Read from the DensityCell counters, so cost grows with occupied cells, not markers
+    params = request.query_params
+    cell_size = parse_positive_int(params, 'cell', default=250)
+    if cell_size not in HEATMAP_CELL_SIZES:
+        raise ValidationError({'cell': f'Must be one of {", ".join(map(str, HEATMAP_CELL_SIZES))}.'})
+    kind = params.get('type')
+    if kind not in (None, '', 'business', 'investible'):
+        raise ValidationError({'type': 'Must be business or investible.'})
+    return Response(heatmap(cell_size, kind=kind, industry=params.get('industry'), status=params.get('status')))
+
+
+# DASHBOARD
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_dashboard_summary(request):
+    # One primary-key read; the row's version doubles as the ETag
+    summary = get_summary()
+    etag = f'"dashboard-summary-{summary.version}"'
+    last_modified = int(summary.updated_at.timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = Response(dict(summary.counts, version=summary.version, updated_at=summary.updated_at))
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+    return response
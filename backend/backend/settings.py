@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -76,6 +77,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Opt-in keyset pagination: unpaged unless ?cursor= or ?page_size= is sent
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.OptInCursorPagination',
 }
 
 from datetime import timedelta
@@ -161,6 +164,33 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Caches
+# "responses" backs the write-invalidated response cache (api/response_cache.py).
+# Swap in 'django.core.cache.backends.filebased.FileBasedCache' with a directory
+# LOCATION, or 'django.core.cache.backends.redis.RedisCache' with
+# LOCATION 'redis://127.0.0.1:6379' to share it between workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'imbds-responses',
+        'TIMEOUT': 600,
+    },
+}
+
+# Filesystem cache for generated marker vector tiles (api/vector_tiles.py)
+TILE_CACHE_DIR = BASE_DIR / 'tile_cache'
+
+# City boundary, one polygon per barangay. Their union bounds new markers and
+# frames the heatmap grid; `manage.py load_zones` loads the same file as marker
+# zones (api/boundary.py). Shipped with the backend as a copy of the front end's
+# public/assets/san_fernando_boundary.geojson; override with $CITY_BOUNDARY_FILE.
+CITY_BOUNDARY_FILE = Path(os.environ.get(
+    'CITY_BOUNDARY_FILE', BASE_DIR / 'api' / 'data' / 'san_fernando_boundary.geojson'
+))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -9,7 +9,7 @@ import MarkerFormModal from '../components/Modals/MarkerFormModal';
 import DeleteConfirmModal from '../components/Modals/DeleteConfirmModal';
 import MarkerEditModal from '../components/Modals/MarkerEditModal';
 import SelectionModal from '../components/Modals/SelectionModal';
-import { apiClient } from '../api/api_urls';
+import { apiClient, API_URLS } from '../api/api_urls';
 import { businessIcons } from '../assets/icons/icons';
 import { investibleIcon } from "../assets/icons/icons";
 import DeleteWarningModal from '../components/Modals/DeleteWarningModal';
@@ -263,6 +263,25 @@ export default function Map() {
     refreshMarkers();
   }, [refreshMarkers]);
 
+  // Apply marker changes pushed by the server instead of refetching the whole list
+  useEffect(() => {
+    const source = new EventSource(`${API_URLS}markers/events/`, { withCredentials: true });
+    source.addEventListener('marker', (e) => {
+      const event = JSON.parse(e.data);
+      if (event.op === 'upsert') {
+        setSavedMarkers((prev) => {
+          const rest = prev.filter((m) => m.marker_id !== event.marker.marker_id);
+          return [...rest, event.marker];
+        });
+      } else if (event.op === 'delete') {
+        setSavedMarkers((prev) => prev.filter((m) => m.marker_id !== event.marker_id));
+      } else if (event.op === 'resync') {
+        refreshMarkers();
+      }
+    });
+    return () => source.close();
+  }, [refreshMarkers]);
+
   useEffect(() => {
     savedMarkers.forEach((m) => {
       const industry = m.business?.industry;
@@ -338,47 +357,40 @@ export default function Map() {
     }
 
     try {
-      if (markerType === 'business') {
-        // Business marker - existing logic
-        const businessRes = await apiClient.post('businesses/', {
-          bsns_name: formData.label,
-          bsns_address: formData.location,
-          industry: formData.industry,
-        });
-
-        const markerRes = await apiClient.post('markers/', {
+      // Owner and marker are created together in one atomic request
+      const markerRes = await apiClient.post('markers/place/', markerType === 'business'
+        ? {
           label: formData.label,
           latitude: newMarker.lat,
           longitude: newMarker.lng,
-          business_id: businessRes.data.business_id,
-        });
-
-        if (newMarker.layer) newMarker.layer.options.markerId = markerRes.data.marker_id;
-        setSavedMarkers((prev) => [...prev, markerRes.data]);
-      }
-
-      if (markerType === 'investible') {
-        const investibleRes = await apiClient.post('investibles/', {
-          invst_location: formData.location,
-          invst_description: formData.preferred_business || 'Investible property',
-          area: formData.area,
-          preferred_business: formData.preferred_business,
-          landmark: formData.landmark,
-          contact_person: formData.contact_person,
-          contact_number: formData.contact_number,
-          status: formData.status || 'available',
-        });
-
-        const markerRes = await apiClient.post('markers/', {
+          business: {
+            bsns_name: formData.label,
+            bsns_address: formData.location,
+            industry: formData.industry,
+          },
+        }
+        : {
           label: "Investible", // ✅ Set default label here
           latitude: newMarker.lat,
           longitude: newMarker.lng,
-          investible_id: investibleRes.data.investible_id,
+          investible: {
+            invst_location: formData.location,
+            invst_description: formData.preferred_business || 'Investible property',
+            area: formData.area,
+            preferred_business: formData.preferred_business,
+            landmark: formData.landmark,
+            contact_person: formData.contact_person,
+            contact_number: formData.contact_number,
+            status: formData.status || 'available',
+          },
         });
 
-        if (newMarker.layer) newMarker.layer.options.markerId = markerRes.data.marker_id;
-        setSavedMarkers((prev) => [...prev, markerRes.data]);
-      }
+      if (newMarker.layer) newMarker.layer.options.markerId = markerRes.data.marker_id;
+      // The SSE upsert for this marker may already have arrived
+      setSavedMarkers((prev) => [
+        ...prev.filter((m) => m.marker_id !== markerRes.data.marker_id),
+        markerRes.data,
+      ]);
       setModalOpen(false);
       setNewMarker(null);
       setPendingDelete(null);
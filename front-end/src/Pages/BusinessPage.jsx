@@ -9,6 +9,8 @@ const BusinessPage = () => {
   const navigate = useNavigate();
   const [businesses, setBusinesses] = useState([]);
   const [search, setSearch] = useState("");
+  const [industryFilter, setIndustryFilter] = useState("");
+  const [statusFilter, setStatusFilter] = useState("");
   const [modalOpen, setModalOpen] = useState(false);
   const [editingBusiness, setEditingBusiness] = useState(null);
   const [isLoadingBusinesses, setIsLoadingBusinesses] = useState(true);
@@ -31,7 +33,11 @@ const BusinessPage = () => {
     }
 
     try {
-      const response = await apiClient.get('businesses/');
+      // Industry/status are filtered server-side; the search box still filters the result
+      const params = {};
+      if (industryFilter) params.industry = industryFilter;
+      if (statusFilter) params.status = statusFilter;
+      const response = await apiClient.get('businesses/', { params });
       setBusinesses(response.data);
     } catch (error) {
       console.error('Error fetching businesses:', error);
@@ -50,7 +56,7 @@ const BusinessPage = () => {
     } else if (!authLoading && !user) {
       navigate('/login');
     }
-  }, [user, apiClient, logout, navigate, authLoading]);
+  }, [user, apiClient, logout, navigate, authLoading, industryFilter, statusFilter]);
 
   const handleEdit = (businessToEdit) => {
     setEditingBusiness(businessToEdit);
@@ -119,6 +125,33 @@ const BusinessPage = () => {
             value={search}
             onChange={(e) => setSearch(e.target.value)}
           />
+          <div className="flex gap-2">
+            <select
+              className="border px-3 py-2 rounded"
+              value={industryFilter}
+              onChange={(e) => setIndustryFilter(e.target.value)}
+            >
+              <option value="">All industries</option>
+              <option value="mall">Mall</option>
+              <option value="restaurant">Restaurant</option>
+              <option value="school">School</option>
+              <option value="hospital">Hospital</option>
+              <option value="office">Office</option>
+              <option value="market">Market</option>
+              <option value="other">Other</option>
+            </select>
+            <select
+              className="border px-3 py-2 rounded"
+              value={statusFilter}
+              onChange={(e) => setStatusFilter(e.target.value)}
+            >
+              <option value="">All statuses</option>
+              <option value="active">Active</option>
+              <option value="inactive">Inactive</option>
+              <option value="pending">Pending</option>
+              <option value="archived">Archived</option>
+            </select>
+          </div>
           {/* Add Business button is removed as businesses are created via markers */}
         </div>
 
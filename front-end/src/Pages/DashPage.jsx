@@ -40,46 +40,23 @@ const DashPage = () => {
     }
 
     try {
-      // Fetch Users
-      const usersResponse = await apiClient.get('users/');
-      const totalUsers = usersResponse.data.length;
-
-      // Fetch Businesses
-      const businessesResponse = await apiClient.get('businesses/');
-      const totalBusinesses = businessesResponse.data.length;
-      const activeBusinesses = businessesResponse.data.filter(b => b.status === 'active').length;
-      const inactiveBusinesses = businessesResponse.data.filter(b => b.status === 'inactive').length;
-      const pendingBusinesses = businessesResponse.data.filter(b => b.status === 'pending').length;
-      const archivedBusinesses = businessesResponse.data.filter(b => b.status === 'archived').length;
-
-      // Fetch Investibles
-      const investiblesResponse = await apiClient.get('investibles/');
-      const totalInvestibles = investiblesResponse.data.length;
-      const availableInvestibles = investiblesResponse.data.filter(i => i.status === 'available').length;
-      const soldInvestibles = investiblesResponse.data.filter(i => i.status === 'sold').length;
-      const pendingInvestibles = investiblesResponse.data.filter(i => i.status === 'pending').length;
-
-      // Fetch Markers
-      const markersResponse = await apiClient.get('markers/');
-      const totalMarkers = markersResponse.data.length;
-
-      // Fetch Reports
-      const reportsResponse = await apiClient.get('reports/');
-      const totalReports = reportsResponse.data.length;
+      // Every total comes from one precomputed summary row
+      const { data } = await apiClient.get('dashboard/summary/');
+      const { businesses, investibles } = data;
 
       setDashboardData({
-        totalUsers,
-        totalBusinesses,
-        activeBusinesses,
-        inactiveBusinesses,
-        pendingBusinesses,
-        archivedBusinesses,
-        totalInvestibles,
-        availableInvestibles,
-        soldInvestibles,
-        pendingInvestibles,
-        totalMarkers,
-        totalReports,
+        totalUsers: data.users.total,
+        totalBusinesses: businesses.total,
+        activeBusinesses: businesses.by_status.active,
+        inactiveBusinesses: businesses.by_status.inactive,
+        pendingBusinesses: businesses.by_status.pending,
+        archivedBusinesses: businesses.by_status.archived,
+        totalInvestibles: investibles.total,
+        availableInvestibles: investibles.by_status.available,
+        soldInvestibles: investibles.by_status.sold,
+        pendingInvestibles: investibles.by_status.pending,
+        totalMarkers: data.markers.total,
+        totalReports: data.reports.total,
       });
     } catch (error) {
       console.error('Error fetching dashboard data:', error);
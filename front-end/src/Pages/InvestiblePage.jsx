@@ -9,6 +9,7 @@ const InvestiblePage = () => {
   const navigate = useNavigate();
   const [investibles, setInvestibles] = useState([]);
   const [search, setSearch] = useState("");
+  const [statusFilter, setStatusFilter] = useState("");
   const [modalOpen, setModalOpen] = useState(false);
   const [editingInvestible, setEditingInvestible] = useState(null);
   const [isLoadingInvestibles, setIsLoadingInvestibles] = useState(true);
@@ -31,7 +32,9 @@ const InvestiblePage = () => {
     }
 
     try {
-      const response = await apiClient.get('investibles/');
+      // Status is filtered server-side; the search box still filters the result
+      const params = statusFilter ? { status: statusFilter } : {};
+      const response = await apiClient.get('investibles/', { params });
       setInvestibles(response.data);
     } catch (error) {
       console.error('Error fetching investibles:', error);
@@ -50,7 +53,7 @@ const InvestiblePage = () => {
     } else if (!authLoading && !user) {
       navigate('/login');
     }
-  }, [user, apiClient, logout, navigate, authLoading]);
+  }, [user, apiClient, logout, navigate, authLoading, statusFilter]);
 
   const handleEdit = (investibleToEdit) => {
     setEditingInvestible(investibleToEdit);
@@ -123,6 +126,16 @@ const InvestiblePage = () => {
             value={search}
             onChange={(e) => setSearch(e.target.value)}
           />
+          <select
+            className="border px-3 py-2 rounded"
+            value={statusFilter}
+            onChange={(e) => setStatusFilter(e.target.value)}
+          >
+            <option value="">All statuses</option>
+            <option value="available">Available</option>
+            <option value="sold">Sold</option>
+            <option value="pending">Pending</option>
+          </select>
         </div>
 
         {isLoadingInvestibles ? (
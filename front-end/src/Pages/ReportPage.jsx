@@ -4,14 +4,24 @@ import Layout from '../components/Layout';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router';
 import { useReactToPrint } from 'react-to-print';
+import { API_URLS } from '../api/api_urls';
+
+// Server-side exports stream every matching row, so full-year extracts never load in the browser
+const EXPORTS = [
+  { path: 'businesses', label: 'Businesses' },
+  { path: 'investibles', label: 'Investibles' },
+  { path: 'reports', label: 'Reports' },
+];
 
 const ReportPage = () => {
   const { user, apiClient, logout, loading: authLoading } = useAuth();
   const navigate = useNavigate();
-  const [businesses, setBusinesses] = useState([]);
+  const [stats, setStats] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [fetchError, setFetchError] = useState(null);
   const componentRef = useRef();
+  const [exportFrom, setExportFrom] = useState('');
+  const [exportTo, setExportTo] = useState('');
 
   const fetchBusinesses = useCallback(async () => {
     setIsLoading(true);
@@ -29,8 +39,8 @@ const ReportPage = () => {
     }
 
     try {
-      const response = await apiClient.get('businesses/');
-      setBusinesses(response.data);
+      const response = await apiClient.get('stats/businesses/');
+      setStats(response.data);
     } catch (error) {
       console.error('Error fetching businesses for report:', error);
       setFetchError('Failed to load business data for the report. Please try again.');
@@ -47,24 +57,17 @@ const ReportPage = () => {
   }, [fetchBusinesses]);
 
   const generateReportData = () => {
-    const totalBusinesses = businesses.length;
-    const activeBusinesses = businesses.filter(b => b.status === 'active').length;
-    const inactiveBusinesses = businesses.filter(b => b.status === 'inactive').length;
-    const pendingBusinesses = businesses.filter(b => b.status === 'pending').length;
-    const archivedBusinesses = businesses.filter(b => b.status === 'archived').length;
+    // Counts are aggregated server-side by /api/stats/businesses/
+    const byStatus = stats?.by_status || {};
+    const totalBusinesses = stats?.total || 0;
+    const activeBusinesses = byStatus.active || 0;
+    const inactiveBusinesses = byStatus.inactive || 0;
+    const pendingBusinesses = byStatus.pending || 0;
+    const archivedBusinesses = byStatus.archived || 0;
 
-    const industryDistribution = businesses.reduce((acc, b) => {
-      acc[b.industry] = (acc[b.industry] || 0) + 1;
-      return acc;
-    }, {});
+    const industryDistribution = stats?.by_industry || {};
 
-    const statusBreakdownByIndustry = businesses.reduce((acc, b) => {
-      if (!acc[b.industry]) {
-        acc[b.industry] = { active: 0, inactive: 0, pending: 0, archived: 0 };
-      }
-      acc[b.industry][b.status] += 1;
-      return acc;
-    }, {});
+    const statusBreakdownByIndustry = stats?.by_industry_status || {};
 
     return {
       totalBusinesses,
@@ -84,6 +87,14 @@ const ReportPage = () => {
     documentTitle: `Business_Summary_Report_${new Date().toLocaleDateString()}`,
   });
 
+  const exportUrl = (path, format) => {
+    const params = new URLSearchParams();
+    if (exportFrom) params.set('from', exportFrom);
+    if (exportTo) params.set('to', exportTo);
+    const query = params.toString();
+    return `${API_URLS}${path}/export.${format}${query ? `?${query}` : ''}`;
+  };
+
   if (isLoading) {
     return (
       <Layout>
@@ -112,6 +123,35 @@ const ReportPage = () => {
           </button>
         </div>
 
+        <div className="flex flex-wrap items-center gap-3 mb-4">
+          <label className="text-sm text-gray-700">
+            From{' '}
+            <input
+              type="date"
+              value={exportFrom}
+              onChange={(e) => setExportFrom(e.target.value)}
+              className="border rounded px-2 py-1"
+            />
+          </label>
+          <label className="text-sm text-gray-700">
+            To{' '}
+            <input
+              type="date"
+              value={exportTo}
+              onChange={(e) => setExportTo(e.target.value)}
+              className="border rounded px-2 py-1"
+            />
+          </label>
+          {EXPORTS.map(({ path, label }) => (
+            <span key={path} className="text-sm text-gray-700">
+              {label}:{' '}
+              <a href={exportUrl(path, 'csv')} className="text-blue-600 hover:underline">CSV</a>
+              {' / '}
+              <a href={exportUrl(path, 'xlsx')} className="text-blue-600 hover:underline">XLSX</a>
+            </span>
+          ))}
+        </div>
+
         <div ref={componentRef} className="bg-white p-8 shadow-lg rounded-lg">
           <h1 className="text-3xl font-bold text-center mb-6 text-gray-800">
             Business Summary Report